@@ -8,20 +8,25 @@ Endpoints:
     GET /analytics/kpis                  — aggregated KPIs
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from collections import Counter
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi_cache.decorator import cache
 from typing import Optional
 
+from api.dependencies import get_engineer
 from services.feature_engineering import FeatureEngineer
-from db.supabase_client import supabase
+from db.supabase_client import async_supabase
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
-engineer = FeatureEngineer()
 
 
 # ── GET /analytics/signals/all ───────────────────────────────────────
 
 @router.get("/signals/all")
-async def get_all_signals():
+@cache(expire=300)
+async def get_all_signals(engineer: FeatureEngineer = Depends(get_engineer)):
     """Compute intelligence signals for every product."""
     results = await engineer.compute_all_products()
     if not results:
@@ -36,7 +41,11 @@ async def get_all_signals():
 # ── GET /analytics/signals/{product_id} ──────────────────────────────
 
 @router.get("/signals/{product_id}")
-async def get_product_signals(product_id: str, your_price: Optional[float] = None):
+async def get_product_signals(
+    product_id: str,
+    your_price: Optional[float] = None,
+    engineer: FeatureEngineer = Depends(get_engineer),
+):
     """
     Compute intelligence signals for a single product.
 
@@ -48,7 +57,7 @@ async def get_product_signals(product_id: str, your_price: Optional[float] = Non
     if your_price is None:
         try:
             resp = (
-                supabase.table("products")
+                await async_supabase.table("products")
                 .select("base_price")
                 .eq("id", product_id)
                 .limit(1)
@@ -70,7 +79,8 @@ async def get_product_signals(product_id: str, your_price: Optional[float] = Non
 # ── GET /analytics/kpis ──────────────────────────────────────────────
 
 @router.get("/kpis")
-async def get_kpis():
+@cache(expire=300)
+async def get_kpis(engineer: FeatureEngineer = Depends(get_engineer)):
     """
     Aggregated KPIs across all products:
         - Total revenue (estimated)
@@ -93,21 +103,26 @@ async def get_kpis():
         }
 
     n = len(all_signals)
-    avg_growth = sum(s.get("demand_growth_rate", 0) for s in all_signals) / n
-    avg_position = sum(s.get("price_position_index", 1) for s in all_signals) / n
-    avg_momentum = sum(s.get("trend_momentum", 0) for s in all_signals) / n
 
-    # Volatility breakdown
-    vol_counts = {"low": 0, "medium": 0, "high": 0}
-    for s in all_signals:
-        vol = s.get("price_volatility", "low")
-        vol_counts[vol] = vol_counts.get(vol, 0) + 1
+    def column(key: str, default: float) -> np.ndarray:
+        return np.fromiter(
+            (s.get(key, default) for s in all_signals), dtype=np.float64, count=n,
+        )
+
+    avg_growth = float(column("demand_growth_rate", 0).mean())
+    avg_position = float(column("price_position_index", 1).mean())
+    avg_momentum = float(column("trend_momentum", 0).mean())
 
     # Estimated daily revenue = sum(price * avg_demand_proxy)
-    est_daily_revenue = sum(
-        s.get("your_price", 0) * max(s.get("moving_avg_demand", 0), 1)
-        for s in all_signals
-    )
+    est_daily_revenue = float(np.dot(
+        column("your_price", 0), np.maximum(column("moving_avg_demand", 0), 1),
+    ))
+
+    # Volatility breakdown
+    vol_counts = {
+        "low": 0, "medium": 0, "high": 0,
+        **Counter(s.get("price_volatility", "low") for s in all_signals),
+    }
 
     return {
         "status": "ok",
@@ -119,7 +134,7 @@ async def get_kpis():
             "avg_price_position": round(avg_position, 4),
             "avg_trend_momentum": round(avg_momentum, 2),
             "volatility_breakdown": vol_counts,
-            "computed_at": all_signals[0].get("computed_at") if all_signals else None,
+            "computed_at": all_signals[0].get("computed_at"),
         },
     }
 
@@ -127,7 +142,7 @@ async def get_kpis():
 # ── GET /analytics/summary ──────────────────────────────────────────
 
 @router.get("/summary")
-async def get_analytics_summary():
+async def get_analytics_summary(engineer: FeatureEngineer = Depends(get_engineer)):
     """
     High-level intelligence summary for the dashboard.
     Returns demand momentum, price opportunity score,
@@ -7,45 +7,105 @@ Endpoints:
     POST /competitors/scrape       → trigger a scrape job
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import Optional
 
-from db.supabase_client import supabase
-from db.schemas import CompetitorPriceResponse
+from db.supabase_client import async_supabase
+from db.schemas import CompetitorPriceResponse, ScrapeTarget
 from services.scraper import CompetitorScraper
 
 router = APIRouter(prefix="/competitors", tags=["Competitors"])
 
+# Columns exposed by CompetitorPriceResponse
+COMPETITOR_PRICE_COLUMNS = "id, product_id, competitor_name, price, recorded_at"
+
+
+def _encode_cursor(row: dict) -> str:
+    """Keyset cursor for the row a page ended on: recorded_at|id."""
+    return f"{row['recorded_at']}|{row['id']}"
+
+
+def _decode_cursor(cursor: str) -> tuple[str, str]:
+    """Split a cursor from _encode_cursor back into (recorded_at, id)."""
+    recorded_at, sep, row_id = cursor.rpartition("|")
+    if not sep or not recorded_at or not row_id:
+        raise HTTPException(status_code=400, detail="Malformed cursor; pass next_cursor from the previous page")
+    return recorded_at, row_id
+
+
+def _quote_filter_value(value: str) -> str:
+    """Double-quote a value for a PostgREST logic tree (or_ filter)."""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
 
 @router.get("/", summary="List all competitor prices")
 async def list_competitor_prices(
+    response: Response,
     limit: int = Query(default=50, ge=1, le=500),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="next_cursor from the previous page (keyset pagination); not combinable with offset",
+    ),
     competitor_name: Optional[str] = None,
 ):
     """
     Retrieve stored competitor pricing data.
-    Supports pagination and optional filtering by competitor name.
+    Supports offset or cursor pagination and optional filtering by
+    competitor name. The number of rows matching the filters, over all
+    pages, is returned in the X-Total-Count header.
     """
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="Use either cursor or offset, not both")
+
     try:
+        # recorded_at is not unique (one batch insert shares a timestamp),
+        # so id breaks ties and rows are ordered by both
         query = (
-            supabase.table("competitor_prices")
-            .select("*")
+            async_supabase.table("competitor_prices")
+            .select(COMPETITOR_PRICE_COLUMNS)
             .order("recorded_at", desc=True)
-            .range(offset, offset + limit - 1)
+            .order("id", desc=True)
+        )
+        # Total for X-Total-Count: the same filters, without the cursor
+        count_query = (
+            async_supabase.table("competitor_prices")
+            .select("id", count="planned", head=True)
         )
 
         if competitor_name:
             query = query.eq("competitor_name", competitor_name)
+            count_query = count_query.eq("competitor_name", competitor_name)
+
+        # Keyset pagination seeks straight to the cursor instead of
+        # scanning and discarding `offset` rows
+        if cursor:
+            recorded_at, row_id = _decode_cursor(cursor)
+            at, rid = _quote_filter_value(recorded_at), _quote_filter_value(row_id)
+            query = query.or_(
+                f"recorded_at.lt.{at},and(recorded_at.eq.{at},id.lt.{rid})"
+            ).limit(limit)
+        else:
+            query = query.range(offset, offset + limit - 1)
 
-        response = query.execute()
+        result, count_result = await asyncio.gather(query.execute(), count_query.execute())
+        rows = result.data
+
+        if count_result.count is not None:
+            response.headers["X-Total-Count"] = str(count_result.count)
 
         return {
             "status": "success",
-            "count": len(response.data),
-            "data": response.data,
+            "count": len(rows),
+            "next_cursor": _encode_cursor(rows[-1]) if len(rows) == limit else None,
+            "data": rows,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database query failed: {str(e)}")
 
@@ -61,8 +121,8 @@ async def get_product_price_history(
     """
     try:
         response = (
-            supabase.table("competitor_prices")
-            .select("*")
+            await async_supabase.table("competitor_prices")
+            .select(COMPETITOR_PRICE_COLUMNS)
             .eq("product_id", product_id)
             .order("recorded_at", desc=True)
             .limit(limit)
@@ -89,7 +149,7 @@ async def get_product_price_history(
 
 
 @router.post("/scrape", summary="Trigger a competitor scrape job")
-async def trigger_scrape(targets: list[dict]):
+async def trigger_scrape(targets: list[ScrapeTarget]):
     """
     Trigger a competitor price scrape job.
 
@@ -99,21 +159,14 @@ async def trigger_scrape(targets: list[dict]):
         - url: str (page URL to scrape)
 
     Returns scrape results with success/error breakdown.
+    Targets with a missing field, an empty competitor name or a malformed
+    URL are rejected with 422 by request validation.
     """
     if not targets:
         raise HTTPException(status_code=400, detail="No scrape targets provided")
 
-    # Validate target structure
-    for i, target in enumerate(targets):
-        if "url" not in target:
-            raise HTTPException(status_code=400, detail=f"Target {i} missing 'url'")
-        if "product_id" not in target:
-            raise HTTPException(status_code=400, detail=f"Target {i} missing 'product_id'")
-        if "competitor_name" not in target:
-            raise HTTPException(status_code=400, detail=f"Target {i} missing 'competitor_name'")
-
     scraper = CompetitorScraper()
-    result = await scraper.scrape_all(targets)
+    result = await scraper.scrape_all([t.model_dump(mode="json") for t in targets])
 
     return {
         "status": "success",
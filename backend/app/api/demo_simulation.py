@@ -1,7 +1,9 @@
 from fastapi import APIRouter, HTTPException
+from fastapi_cache import FastAPICache
 from pydantic import BaseModel
 from typing import Optional
-from db.supabase_client import supabase
+from core.cache import clear_ttl_caches
+from db.supabase_client import async_supabase
 import uuid
 from datetime import datetime
 
@@ -19,7 +21,9 @@ class MarketEventRequest(BaseModel):
 async def apply_price(req: ApplyPriceRequest):
     """Update a product's base price to simulate accepting an AI recommendation."""
     try:
-        response = supabase.table("products").update({"base_price": req.price}).eq("id", req.product_id).execute()
+        response = await async_supabase.table("products").update({"base_price": req.price}).eq("id", req.product_id).execute()
+        await FastAPICache.clear()
+        clear_ttl_caches()
         return {"status": "success", "message": f"Price updated to {req.price}"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -30,14 +34,14 @@ async def simulate_market(req: MarketEventRequest):
     try:
         if req.event_type == "surge":
             # Add a massive sales bump today
-            supabase.table("sales_data").insert({
+            await async_supabase.table("sales_data").insert({
                 "product_id": req.product_id,
                 "units_sold": 500,
                 "sale_date": datetime.now().strftime("%Y-%m-%d")
             }).execute()
             
             # Add a trend spike
-            supabase.table("trend_metrics").insert({
+            await async_supabase.table("trend_metrics").insert({
                 "product_id": req.product_id,
                 "trend_score": 98.0,
                 "recorded_at": datetime.now().isoformat()
@@ -45,10 +49,10 @@ async def simulate_market(req: MarketEventRequest):
             
         elif req.event_type == "competitor_undercut":
             # Add an aggressive competitor price drop
-            current_product = supabase.table("products").select("base_price").eq("id", req.product_id).execute()
+            current_product = await async_supabase.table("products").select("base_price").eq("id", req.product_id).execute()
             p = current_product.data[0]['base_price'] if current_product.data else 100.0
             
-            supabase.table("competitor_prices").insert({
+            await async_supabase.table("competitor_prices").insert({
                 "product_id": req.product_id,
                 "competitor_name": "AggressiveRival",
                 "price": round(p * 0.70, 2), # 30% cheaper!
@@ -56,7 +60,10 @@ async def simulate_market(req: MarketEventRequest):
             }).execute()
         else:
             raise HTTPException(status_code=400, detail="Unknown event type.")
-            
+
+        # Drop cached aggregates and lookups so the dashboard reflects the event immediately
+        await FastAPICache.clear()
+        clear_ttl_caches()
         return {"status": "success", "event": req.event_type}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
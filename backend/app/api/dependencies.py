@@ -0,0 +1,33 @@
+"""
+Service dependencies — Model and engine instances are built once per
+worker in the app lifespan (see main.py) and injected into route
+handlers from app.state.
+"""
+
+from fastapi import Request
+
+from models.demand_model import DemandForecaster
+from models.elasticity_model import ElasticityEstimator
+from models.price_optimizer import PriceOptimizer
+from services.decision_engine import DecisionEngine
+from services.feature_engineering import FeatureEngineer
+
+
+def get_engineer(request: Request) -> FeatureEngineer:
+    return request.app.state.engineer
+
+
+def get_forecaster(request: Request) -> DemandForecaster:
+    return request.app.state.forecaster
+
+
+def get_estimator(request: Request) -> ElasticityEstimator:
+    return request.app.state.estimator
+
+
+def get_optimizer(request: Request) -> PriceOptimizer:
+    return request.app.state.optimizer
+
+
+def get_decision_engine(request: Request) -> DecisionEngine:
+    return request.app.state.engine
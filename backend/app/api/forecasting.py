@@ -7,14 +7,14 @@ Endpoints:
     GET  /forecasting/model-metrics         — model performance stats
 """
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import Optional
 
+from api.dependencies import get_forecaster
 from models.demand_model import DemandForecaster
-from db.supabase_client import supabase
+from db.supabase_client import async_supabase
 
 router = APIRouter(prefix="/forecasting", tags=["Forecasting"])
-forecaster = DemandForecaster()
 
 
 # ── POST /forecasting/predict/{product_id} ───────────────────────────
@@ -24,6 +24,7 @@ async def predict_demand(
     product_id: str,
     horizon_days: int = Query(14, ge=7, le=30),
     save: bool = Query(True),
+    forecaster: DemandForecaster = Depends(get_forecaster),
 ):
     """
     Generate a demand forecast for a product.
@@ -48,13 +49,17 @@ async def predict_demand(
 # ── GET /forecasting/latest/{product_id} ─────────────────────────────
 
 @router.get("/latest/{product_id}")
-async def get_latest_forecast(product_id: str, limit: int = Query(14, ge=1, le=60)):
+async def get_latest_forecast(
+    product_id: str,
+    limit: int = Query(14, ge=1, le=60),
+    forecaster: DemandForecaster = Depends(get_forecaster),
+):
     """
     Get the most recently saved forecast for a product.
     """
     try:
         response = (
-            supabase.table("demand_forecasts")
+            await async_supabase.table("demand_forecasts")
             .select("*")
             .eq("product_id", product_id)
             .order("forecast_date", desc=True)
@@ -99,7 +104,7 @@ async def get_model_metrics():
     Return model performance metrics across all products.
     """
     try:
-        products = supabase.table("products").select("id, name").execute()
+        products = await async_supabase.table("products").select("id, name").execute()
         product_list = products.data or []
     except Exception as e:
         raise HTTPException(500, f"Database error: {e}")
@@ -113,35 +118,28 @@ async def get_model_metrics():
             },
         }
 
-    # Get forecast stats for each product
+    # Stats over the latest 30 forecasts of up to 10 products, aggregated
+    # in the database in a single round-trip
+    product_list = product_list[:10]
+    try:
+        resp = await async_supabase.rpc(
+            "forecast_stats", {"pids": [p["id"] for p in product_list], "n": 30},
+        ).execute()
+        stats = {row["product_id"]: row for row in resp.data or []}
+    except Exception as e:
+        raise HTTPException(500, f"Database error: {e}")
+
     product_metrics = []
-    total_forecasts = 0
-
-    for p in product_list[:10]:  # cap to 10 products
-        try:
-            resp = (
-                supabase.table("demand_forecasts")
-                .select("predicted_demand, confidence")
-                .eq("product_id", p["id"])
-                .order("created_at", desc=True)
-                .limit(30)
-                .execute()
-            )
-            forecasts = resp.data or []
-            count = len(forecasts)
-            total_forecasts += count
-
-            avg_demand = sum(float(f["predicted_demand"]) for f in forecasts) / count if count > 0 else 0.0
-            avg_conf = sum(float(f["confidence"]) for f in forecasts) / count if count > 0 else 0.0
-            product_metrics.append({
-                "product_id": p["id"],
-                "product_name": p["name"],
-                "forecast_count": count,
-                "avg_predicted_demand": round(avg_demand, 1),
-                "avg_confidence": round(avg_conf, 4),
-            })
-        except Exception:
-            continue
+    for p in product_list:
+        row = stats.get(p["id"], {})
+        product_metrics.append({
+            "product_id": p["id"],
+            "product_name": p["name"],
+            "forecast_count": int(row.get("forecast_count") or 0),
+            "avg_predicted_demand": round(float(row.get("avg_demand") or 0), 1),
+            "avg_confidence": round(float(row.get("avg_confidence") or 0), 4),
+        })
+    total_forecasts = sum(m["forecast_count"] for m in product_metrics)
 
     return {
         "status": "ok",
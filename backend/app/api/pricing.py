@@ -10,24 +10,32 @@ Endpoints:
     GET /pricing/recommendations/{product_id}  — decision engine evaluation
 """
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi_cache.decorator import cache
 from typing import Optional
 
+from api.dependencies import get_decision_engine, get_estimator, get_optimizer
 from models.elasticity_model import ElasticityEstimator
 from models.price_optimizer import PriceOptimizer
 from services.decision_engine import DecisionEngine
-from db.supabase_client import supabase
+from db.supabase_client import async_supabase
 
 router = APIRouter(prefix="/pricing", tags=["Pricing"])
-estimator = ElasticityEstimator()
-optimizer = PriceOptimizer()
-engine = DecisionEngine()
+
+# Rule summary served with /pricing/recommendations (immutable)
+RULES_DOC = DecisionEngine._evaluate_rules.__doc__ or ""
 
 
 # ── GET /pricing/elasticity/{product_id} ─────────────────────────────
 
 @router.get("/elasticity/{product_id}")
-async def get_elasticity(product_id: str, your_price: Optional[float] = None):
+async def get_elasticity(
+    product_id: str,
+    your_price: Optional[float] = None,
+    estimator: ElasticityEstimator = Depends(get_estimator),
+):
     """
     Price elasticity analysis for a product.
 
@@ -41,7 +49,11 @@ async def get_elasticity(product_id: str, your_price: Optional[float] = None):
 # ── GET /pricing/optimize/{product_id} ───────────────────────────────
 
 @router.get("/optimize/{product_id}")
-async def optimize_price(product_id: str, save: bool = Query(True)):
+async def optimize_price(
+    product_id: str,
+    save: bool = Query(True),
+    optimizer: PriceOptimizer = Depends(get_optimizer),
+):
     """
     Full price optimization: finds the revenue-maximizing price,
     generates scenarios, and computes revenue impact.
@@ -53,7 +65,10 @@ async def optimize_price(product_id: str, save: bool = Query(True)):
 # ── GET /pricing/scenarios/{product_id} ──────────────────────────────
 
 @router.get("/scenarios/{product_id}")
-async def get_scenarios(product_id: str):
+async def get_scenarios(
+    product_id: str,
+    optimizer: PriceOptimizer = Depends(get_optimizer),
+):
     """Get pricing scenarios without full optimization."""
     result = await optimizer.optimize(product_id, save_to_db=False)
     return {
@@ -67,35 +82,32 @@ async def get_scenarios(product_id: str):
 # ── GET /pricing/recommendations ─────────────────────────────────────
 
 @router.get("/recommendations")
-async def get_all_recommendations():
+@cache(expire=300)
+async def get_all_recommendations(engine: DecisionEngine = Depends(get_decision_engine)):
     """
     Get all stored price recommendations from the database,
     plus run the decision engine for live recommendations.
     """
-    # Stored recommendations
-    try:
-        response = (
-            supabase.table("price_recommendations")
-            .select("*, products(name)")
-            .order("created_at", desc=True)
-            .limit(50)
-            .execute()
-        )
-        stored = response.data or []
-    except Exception:
-        stored = []
+    # Stored recommendations and the live product list are independent,
+    # so fetch them concurrently
+    stored_resp, products_resp = await asyncio.gather(
+        async_supabase.table("price_recommendations")
+        .select("*, products(name)")
+        .order("created_at", desc=True)
+        .limit(50)
+        .execute(),
+        async_supabase.table("products").select("id, name").limit(10).execute(),
+        return_exceptions=True,
+    )
+    stored = [] if isinstance(stored_resp, Exception) else stored_resp.data or []
+    product_list = [] if isinstance(products_resp, Exception) else products_resp.data or []
 
     # Live decision engine evaluation
-    try:
-        products = supabase.table("products").select("id, name").limit(10).execute()
-        product_list = products.data or []
-    except Exception:
-        product_list = []
-
     live_recommendations = []
     decision_logs = []
-    for p in product_list[:5]:  # cap to 5 products for performance
-        result = await engine.evaluate(p["id"])
+    product_list = product_list[:5]  # cap to 5 products for performance
+    results = await engine.evaluate_many([p["id"] for p in product_list])
+    for p, result in zip(product_list, results):
         for rec in result["recommendations"]:
             rec["product_name"] = result["product_name"]
             rec["product_id"] = p["id"]
@@ -107,14 +119,17 @@ async def get_all_recommendations():
         "stored_recommendations": stored,
         "live_recommendations": live_recommendations,
         "decision_log": decision_logs,
-        "rules": engine._evaluate_rules.__doc__ or "",
+        "rules": RULES_DOC,
     }
 
 
 # ── GET /pricing/recommendations/{product_id} ───────────────────────
 
 @router.get("/recommendations/{product_id}")
-async def get_product_recommendations(product_id: str):
+async def get_product_recommendations(
+    product_id: str,
+    engine: DecisionEngine = Depends(get_decision_engine),
+):
     """
     Run full decision engine evaluation for a specific product.
 
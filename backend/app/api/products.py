@@ -9,7 +9,7 @@ Endpoints:
 from fastapi import APIRouter, HTTPException, Query
 from typing import Optional
 
-from db.supabase_client import supabase
+from db.supabase_client import async_supabase
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -25,7 +25,7 @@ async def list_products(
     """
     try:
         query = (
-            supabase.table("products")
+            async_supabase.table("products")
             .select("*")
             .order("created_at", desc=True)
             .range(offset, offset + limit - 1)
@@ -34,7 +34,7 @@ async def list_products(
         if category:
             query = query.eq("category", category)
 
-        response = query.execute()
+        response = await query.execute()
 
         return {
             "status": "success",
@@ -51,7 +51,7 @@ async def get_product(product_id: str):
     """Get a specific product by ID."""
     try:
         response = (
-            supabase.table("products")
+            await async_supabase.table("products")
             .select("*")
             .eq("id", product_id)
             .limit(1)
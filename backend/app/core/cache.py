@@ -0,0 +1,90 @@
+"""
+TTL Cache — Small in-process cache for slow-changing lookups
+(trend scores, base prices) that the models repeat on every run.
+
+Usage:
+    _prices = TTLCache(maxsize=4096, ttl=900)
+    price = await _prices.get_or_load(product_id, lambda: fetch(product_id))
+
+Call clear_ttl_caches() after writes that change cached values.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable
+
+_MISSING = object()
+
+# Every live cache, so writers can invalidate them all at once
+_caches: "weakref.WeakSet[TTLCache]" = weakref.WeakSet()
+
+
+class TTLCache:
+    """
+    Bounded mapping whose entries expire `ttl` seconds after being set.
+    The oldest entries are evicted first once `maxsize` is reached.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        # Per-key load lock and the number of callers holding or awaiting it
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._waiters: dict[Hashable, int] = {}
+        _caches.add(self)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached value for `key`, awaiting `loader()` on a miss.
+        Concurrent misses for the same key share a single load.
+        Exceptions from `loader` propagate and nothing is cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        # The lock outlives any one caller: it is dropped only when the
+        # last caller holding or awaiting it leaves, so a late arrival
+        # always queues on the same lock instead of loading alongside
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                value = self.get(key, _MISSING)
+                if value is _MISSING:
+                    value = await loader()
+                    self.set(key, value)
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
+        return value
+
+
+def clear_ttl_caches() -> None:
+    """Drop every entry from every TTLCache."""
+    for cache in list(_caches):
+        cache.clear()
@@ -0,0 +1,10 @@
+"""
+Database Constants — Limits shared by every writer to Supabase.
+"""
+
+# Rows per insert request: large enough to amortize the round trip,
+# small enough to stay well under the PostgREST payload limit
+INSERT_BATCH_SIZE = 1000
+
+# Insert requests a writer keeps in flight at once
+INSERT_CONCURRENCY = 8
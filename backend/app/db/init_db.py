@@ -1,10 +1,13 @@
 import sqlite3
 import os
 import uuid
+import logging
 import random
 from datetime import datetime, timedelta
 from db.sqlite_db import DB_PATH, get_db_connection
 
+logger = logging.getLogger("init_db")
+
 def create_tables(conn):
     cursor = conn.cursor()
     cursor.executescript("""
@@ -25,6 +28,9 @@ def create_tables(conn):
             FOREIGN KEY(product_id) REFERENCES products(id) ON DELETE CASCADE
         );
 
+        CREATE INDEX IF NOT EXISTS idx_comp_product_recorded
+            ON competitor_prices(product_id, recorded_at DESC);
+
         CREATE TABLE IF NOT EXISTS trend_metrics (
             id TEXT PRIMARY KEY,
             product_id TEXT,
@@ -67,10 +73,10 @@ def seed_data(conn):
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) as count FROM products")
     if cursor.fetchone()['count'] > 0:
-        print("Database already seeded.")
+        logger.info("Database already seeded.")
         return
 
-    print("Seeding SQLite database with mock historical data...")
+    logger.info("Seeding SQLite database with mock historical data...")
 
     products = [
         {"id": str(uuid.uuid4()), "name": "Quantum X Pro Gaming Mouse", "category": "peripherals", "base_price": 129.99},
@@ -118,7 +124,7 @@ def seed_data(conn):
             )
 
     conn.commit()
-    print("Database seeding complete.")
+    logger.info("Database seeding complete.")
 
 def init_db():
     conn = get_db_connection()
@@ -127,4 +133,5 @@ def init_db():
     conn.close()
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     init_db()
@@ -4,8 +4,15 @@ All tables use product_id (UUID FK → products.id) as the linking key.
 """
 
 from datetime import date, datetime
-from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, HttpUrl, field_validator
+
+
+# Float rounded to 2 decimals after validation (prices, scores, money)
+Rounded2 = Annotated[float, AfterValidator(lambda v: round(v, 2))]
+
+# Response schemas are immutable records with a fixed shape
+RESPONSE_CONFIG = ConfigDict(frozen=True, extra="forbid")
 
 
 # ── Products (central entity) ───────────────────────────────────────
@@ -14,16 +21,13 @@ class ProductCreate(BaseModel):
     """Input schema for creating a product."""
     name: str = Field(..., min_length=1, max_length=255)
     category: str = Field(..., min_length=1, max_length=100)
-    base_price: float = Field(..., gt=0)
-
-    @field_validator("base_price")
-    @classmethod
-    def round_price(cls, v: float) -> float:
-        return round(v, 2)
+    base_price: Rounded2 = Field(..., gt=0)
 
 
 class ProductResponse(BaseModel):
     """Response schema for product records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     name: str
     category: str
@@ -37,16 +41,22 @@ class CompetitorPriceCreate(BaseModel):
     """Input schema for a scraped competitor price."""
     product_id: str = Field(..., description="UUID FK → products.id")
     competitor_name: str = Field(..., min_length=1, max_length=255)
-    price: float = Field(..., gt=0)
+    price: Rounded2 = Field(..., gt=0)
 
-    @field_validator("price")
-    @classmethod
-    def round_price(cls, v: float) -> float:
-        return round(v, 2)
+
+class ScrapeTarget(BaseModel):
+    """Input schema for one competitor page to scrape."""
+    model_config = ConfigDict(extra="forbid")
+
+    product_id: str = Field(..., description="UUID FK → products.id")
+    competitor_name: str = Field(..., min_length=1, max_length=255)
+    url: HttpUrl
 
 
 class CompetitorPriceResponse(BaseModel):
     """Response schema for competitor price records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     product_id: str
     competitor_name: str
@@ -59,16 +69,13 @@ class CompetitorPriceResponse(BaseModel):
 class TrendMetricCreate(BaseModel):
     """Input schema for a trend data point."""
     product_id: str = Field(..., description="UUID FK → products.id")
-    trend_score: float = Field(..., ge=0, le=100)
-
-    @field_validator("trend_score")
-    @classmethod
-    def round_score(cls, v: float) -> float:
-        return round(v, 2)
+    trend_score: Rounded2 = Field(..., ge=0, le=100)
 
 
 class TrendMetricResponse(BaseModel):
     """Response schema for trend metric records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     product_id: str
     trend_score: float
@@ -93,6 +100,8 @@ class SalesRecordCreate(BaseModel):
 
 class SalesRecordResponse(BaseModel):
     """Response schema for sales records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     product_id: str
     units_sold: int
@@ -111,6 +120,8 @@ class DemandForecastCreate(BaseModel):
 
 class DemandForecastResponse(BaseModel):
     """Response schema for demand forecast records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     product_id: str
     predicted_demand: float
@@ -124,18 +135,15 @@ class DemandForecastResponse(BaseModel):
 class PriceRecommendationCreate(BaseModel):
     """Input schema for a price recommendation."""
     product_id: str = Field(..., description="UUID FK → products.id")
-    recommended_price: float = Field(..., gt=0)
-    expected_revenue_change: float = Field(..., ge=0)
+    recommended_price: Rounded2 = Field(..., gt=0)
+    expected_revenue_change: Rounded2 = Field(..., ge=0)
     confidence: float = Field(..., ge=0, le=1)
 
-    @field_validator("recommended_price", "expected_revenue_change")
-    @classmethod
-    def round_money(cls, v: float) -> float:
-        return round(v, 2)
-
 
 class PriceRecommendationResponse(BaseModel):
     """Response schema for price recommendation records."""
+    model_config = RESPONSE_CONFIG
+
     id: str
     product_id: str
     recommended_price: float
@@ -1,30 +1,57 @@
 import sqlite3
 import os
 import logging
+import threading
 from pathlib import Path
 
 logger = logging.getLogger("sqlite_db")
 
 DB_PATH = Path(os.path.dirname(__file__)) / "local_database.sqlite"
 
+# One long-lived connection per thread, reused across queries
+_local = threading.local()
+
 def get_db_connection():
     conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     return conn
 
-def execute_query(query: str, params: tuple = ()):
-    conn = get_db_connection()
+def _thread_connection():
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = get_db_connection()
+        _local.conn = conn
+    return conn
+
+def execute_query(query: str, params: tuple | dict = ()):
+    conn = _thread_connection()
     cursor = conn.cursor()
     try:
         cursor.execute(query, params)
-        if query.strip().upper().startswith("SELECT"):
+        if query.strip().upper().startswith(("SELECT", "WITH")):
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         else:
             conn.commit()
             return cursor.lastrowid
     except Exception as e:
+        conn.rollback()
+        logger.error(f"DB Error: {e} | Query: {query}")
+        raise
+    finally:
+        cursor.close()
+
+def execute_many(query: str, seq_params: list[tuple]):
+    """Run one statement for every parameter tuple in a single transaction."""
+    conn = _thread_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.executemany(query, seq_params)
+        conn.commit()
+        return cursor.rowcount
+    except Exception as e:
+        conn.rollback()
         logger.error(f"DB Error: {e} | Query: {query}")
         raise
     finally:
-        conn.close()
+        cursor.close()
@@ -3,13 +3,170 @@ Supabase Client Mock — Local SQLite drop-in replacement.
 This intercepts standard Supabase Python SDK queries and runs them locally.
 """
 
+import re
+import json
+import asyncio
+import logging
 from pydantic import BaseModel
-from typing import Any
-from db.sqlite_db import execute_query
+from typing import Any, Optional
+from db.sqlite_db import execute_many, execute_query
 import uuid
 
+logger = logging.getLogger("supabase_client")
+
+# SQLite bodies for the Postgres functions in supabase_tables.sql,
+# taking the same named parameters; an array parameter arrives as JSON
+# text, read with json_each
+RPC_FUNCTIONS = {
+    "price_demand_pairs": """
+        WITH s AS (
+            SELECT sale_date AS day, MAX(units_sold) AS units
+            FROM (
+                SELECT sale_date, units_sold FROM sales_data
+                WHERE product_id = :pid AND sale_date >= :since
+                ORDER BY sale_date LIMIT 400
+            )
+            GROUP BY sale_date
+        ), p AS (
+            SELECT substr(recorded_at, 1, 10) AS day, AVG(price) AS avg_price
+            FROM (
+                SELECT price, recorded_at FROM competitor_prices
+                WHERE product_id = :pid
+                ORDER BY recorded_at LIMIT 200
+            )
+            GROUP BY day
+        )
+        SELECT s.day, p.avg_price, s.units FROM s LEFT JOIN p ON p.day = s.day
+        UNION ALL
+        SELECT p.day, p.avg_price, NULL FROM p WHERE p.day NOT IN (SELECT day FROM s)
+        ORDER BY day
+    """,
+    "competitor_avg_price": """
+        SELECT AVG(price) AS avg_price FROM (
+            SELECT price FROM competitor_prices
+            WHERE product_id = :pid
+            ORDER BY recorded_at DESC LIMIT :n
+        )
+    """,
+    "competitor_price_stats": """
+        WITH latest AS (
+            SELECT price FROM competitor_prices
+            WHERE product_id = :pid
+            ORDER BY recorded_at DESC LIMIT :n
+        ), m AS (
+            SELECT AVG(price) AS mu FROM latest
+        )
+        SELECT m.mu AS avg_price,
+               AVG((latest.price - m.mu) * (latest.price - m.mu)) AS var_price,
+               COUNT(latest.price) AS n_prices
+        FROM latest, m
+    """,
+    "latest_competitor_prices": """
+        SELECT product_id, price FROM (
+            SELECT product_id, price, row_number() OVER (
+                PARTITION BY product_id ORDER BY recorded_at DESC
+            ) AS rn
+            FROM competitor_prices
+            WHERE product_id IN (SELECT value FROM json_each(:pids))
+        )
+        WHERE rn <= :n
+        ORDER BY product_id, rn
+    """,
+    "latest_trend_scores": """
+        SELECT product_id, trend_score FROM (
+            SELECT product_id, trend_score, row_number() OVER (
+                PARTITION BY product_id ORDER BY recorded_at DESC
+            ) AS rn
+            FROM trend_metrics
+            WHERE product_id IN (SELECT value FROM json_each(:pids))
+        )
+        WHERE rn <= :n
+        ORDER BY product_id, rn
+    """,
+    "sales_window": """
+        SELECT product_id, units_sold, sale_date FROM (
+            SELECT id, product_id, units_sold, sale_date,
+                   sale_date >= :recent_since AS recent,
+                   row_number() OVER (
+                       PARTITION BY product_id ORDER BY sale_date, id
+                   ) AS head_rn,
+                   row_number() OVER (
+                       PARTITION BY product_id, sale_date >= :recent_since
+                       ORDER BY sale_date DESC, id DESC
+                   ) AS tail_rn
+            FROM sales_data
+            WHERE product_id IN (SELECT value FROM json_each(:pids))
+              AND sale_date >= :since
+        )
+        WHERE head_rn <= :head OR (recent AND tail_rn <= :tail)
+        ORDER BY product_id, sale_date, id
+    """,
+    "forecast_stats": """
+        SELECT product_id, COUNT(*) AS forecast_count,
+               AVG(predicted_demand) AS avg_demand,
+               AVG(confidence) AS avg_confidence
+        FROM (
+            SELECT product_id, predicted_demand, confidence, row_number() OVER (
+                PARTITION BY product_id ORDER BY created_at DESC
+            ) AS rn
+            FROM demand_forecasts
+            WHERE product_id IN (SELECT value FROM json_each(:pids))
+        )
+        WHERE rn <= :n
+        GROUP BY product_id
+    """,
+    "recent_demand_avg": """
+        SELECT AVG(units_sold) AS avg_units FROM sales_data
+        WHERE product_id = :pid AND sale_date >= :since
+    """,
+}
+
+# PostgREST filter operators accepted by or_(), as SQL
+FILTER_OPERATORS = {"eq": "=", "neq": "!=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">="}
+
+# One token of a PostgREST logic tree: and( / or( / ) / , / col.op.value,
+# where a value holding reserved characters is double-quoted
+_FILTER_TOKEN_RE = re.compile(r'\s*(?:(and|or)\(|(\))|(,)|(\w+)\.(\w+)\.("(?:[^"\\]|\\.)*"|[^,()]*))')
+
+
+def _parse_filters(filters: str, params: list) -> str:
+    """
+    Compile a PostgREST logic tree, as passed to or_(), into a SQL
+    expression, appending its values to params.
+    e.g. 'a.lt.1,and(a.eq.1,b.lt.2)' → '(a < ? OR (a = ? AND b < ?))'
+    """
+    pos = 0
+
+    def group(joiner: str) -> str:
+        nonlocal pos
+        parts = []
+        while pos < len(filters):
+            m = _FILTER_TOKEN_RE.match(filters, pos)
+            if not m:
+                raise ValueError(f"Invalid filter near: {filters[pos:]!r}")
+            pos = m.end()
+            nested, close, comma, col, op, val = m.groups()
+            if close:
+                break
+            if comma:
+                continue
+            if nested:
+                parts.append(group(nested.upper()))
+                continue
+            if op not in FILTER_OPERATORS:
+                raise ValueError(f"Unsupported filter operator: {op}")
+            if val.startswith('"'):
+                val = re.sub(r'\\(.)', r'\1', val[1:-1])
+            parts.append(f"{col} {FILTER_OPERATORS[op]} ?")
+            params.append(val)
+        return "(" + f" {joiner} ".join(parts) + ")"
+
+    return group("OR")
+
 class MockResponse(BaseModel):
-    data: list[dict]
+    # list of rows, or one row / None after maybe_single()
+    data: list[dict] | dict | None
+    count: Optional[int] = None
 
 class MockTableQuery:
     def __init__(self, table_name: str):
@@ -18,15 +175,25 @@ class MockTableQuery:
         self._eqs = []
         self._gtes = []
         self._ltes = []
-        self._order = None
+        self._lts = []
+        self._ins = []
+        self._ors = []
+        self._orders = []
         self._limit = None
         self._offset = None
         self._action = "select"
         self._payload = None
+        self._count = None
+        self._head = False
+        self._single = False
 
-    def select(self, fields: str):
+    def select(self, fields: str, count: Optional[str] = None, head: bool = False):
+        # count: "exact" / "planned" / "estimated" — all exact locally
+        # head: return only the count, no rows
         self._action = "select"
         self._select = fields
+        self._count = count
+        self._head = head
         return self
 
     def insert(self, payload: dict | list[dict]):
@@ -55,8 +222,28 @@ class MockTableQuery:
         self._ltes.append((column, value))
         return self
 
+    def lt(self, column: str, value: Any):
+        self._lts.append((column, value))
+        return self
+
+    def in_(self, column: str, values: list[Any]):
+        self._ins.append((column, list(values)))
+        return self
+
+    def or_(self, filters: str):
+        # PostgREST logic tree, e.g. "a.lt.1,and(a.eq.1,b.lt.2)"
+        params = []
+        self._ors.append((_parse_filters(filters, params), params))
+        return self
+
     def order(self, column: str, desc: bool = False):
-        self._order = (column, "DESC" if desc else "ASC")
+        # Chained calls sort by each column in turn, like the SDK
+        self._orders.append((column, "DESC" if desc else "ASC"))
+        return self
+
+    def maybe_single(self):
+        # Return the one matching row (or None) instead of a list
+        self._single = True
         return self
 
     def limit(self, max_limit: int):
@@ -95,11 +282,28 @@ class MockTableQuery:
             where_clauses.append(f"{col} <= ?")
             params.append(val)
 
+        for col, val in self._lts:
+            where_clauses.append(f"{col} < ?")
+            params.append(val)
+
+        for col, vals in self._ins:
+            if not vals:
+                where_clauses.append("1 = 0")
+                continue
+            where_clauses.append(f"{col} IN ({', '.join(['?'] * len(vals))})")
+            params.extend(vals)
+
+        for clause, vals in self._ors:
+            where_clauses.append(clause)
+            params.extend(vals)
+
+        where = ""
         if where_clauses:
-            query += " WHERE " + " AND ".join(where_clauses)
+            where = " WHERE " + " AND ".join(where_clauses)
+        query += where
 
-        if self._order:
-            query += f" ORDER BY {self._order[0]} {self._order[1]}"
+        if self._orders:
+            query += " ORDER BY " + ", ".join(f"{col} {direction}" for col, direction in self._orders)
 
         if self._limit:
             query += f" LIMIT {self._limit}"
@@ -107,25 +311,36 @@ class MockTableQuery:
         if self._offset is not None:
             query += f" OFFSET {self._offset}"
 
-        rows = execute_query(query, tuple(params))
-        return MockResponse(data=rows)
+        rows = [] if self._head else execute_query(query, tuple(params))
+
+        count = None
+        if self._count:
+            count_query = f"SELECT COUNT(*) AS count FROM {self.table_name}{where}"
+            count = execute_query(count_query, tuple(params))[0]["count"]
+
+        if self._single:
+            if len(rows) > 1:
+                raise ValueError("maybe_single() query returned more than one row")
+            return MockResponse(data=rows[0] if rows else None, count=count)
+
+        return MockResponse(data=rows, count=count)
 
     def _execute_insert(self):
-        inserted = []
+        # Rows sharing a column set go in as one executemany batch with a
+        # single commit, instead of one INSERT and commit per row
+        batches: dict[tuple, list[tuple]] = {}
         for row in self._payload:
             # Generate UUID if not provided
             if 'id' not in row:
                 row['id'] = str(uuid.uuid4())
-                
-            cols = list(row.keys())
+            batches.setdefault(tuple(row), []).append(tuple(row.values()))
+
+        for cols, vals in batches.items():
             placeholders = ["?"] * len(cols)
-            vals = list(row.values())
-            
             query = f"INSERT INTO {self.table_name} ({', '.join(cols)}) VALUES ({', '.join(placeholders)})"
-            execute_query(query, tuple(vals))
-            inserted.append(row)
-            
-        return MockResponse(data=inserted)
+            execute_many(query, vals)
+
+        return MockResponse(data=self._payload)
 
     def _execute_update(self):
         set_clauses = []
@@ -164,9 +379,48 @@ class MockTableQuery:
         execute_query(query, tuple(where_params))
         return MockResponse(data=[])
 
+class AsyncMockTableQuery(MockTableQuery):
+    """Awaitable query, mirroring the async Supabase client's execute()."""
+
+    async def execute(self):
+        # SQLite calls block, so run them off the event loop
+        return await asyncio.to_thread(super().execute)
+
+class MockRpcQuery:
+    def __init__(self, fn: str, params: Optional[dict] = None):
+        self.fn = fn
+        self.params = params or {}
+
+    def execute(self):
+        if self.fn not in RPC_FUNCTIONS:
+            raise ValueError(f"Unknown RPC function: {self.fn}")
+        # SQLite can't bind a list, so arrays are passed as JSON arrays
+        params = {
+            k: json.dumps(v) if isinstance(v, (list, tuple)) else v
+            for k, v in self.params.items()
+        }
+        return MockResponse(data=execute_query(RPC_FUNCTIONS[self.fn], params))
+
+class AsyncMockRpcQuery(MockRpcQuery):
+    """Awaitable RPC call, mirroring the async Supabase client's execute()."""
+
+    async def execute(self):
+        return await asyncio.to_thread(super().execute)
+
 class MockSupabaseClient:
     def table(self, table_name: str):
         return MockTableQuery(table_name)
 
+    def rpc(self, fn: str, params: Optional[dict] = None):
+        return MockRpcQuery(fn, params)
+
+class AsyncMockSupabaseClient:
+    def table(self, table_name: str):
+        return AsyncMockTableQuery(table_name)
+
+    def rpc(self, fn: str, params: Optional[dict] = None):
+        return AsyncMockRpcQuery(fn, params)
+
 supabase = MockSupabaseClient()
-print("SQLite Mock Supabase client initialized successfully")
+async_supabase = AsyncMockSupabaseClient()
+logger.info("SQLite Mock Supabase client initialized successfully")
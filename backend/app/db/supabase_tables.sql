@@ -23,6 +23,7 @@ CREATE TABLE IF NOT EXISTS competitor_prices (
 
 CREATE INDEX IF NOT EXISTS idx_comp_product ON competitor_prices(product_id);
 CREATE INDEX IF NOT EXISTS idx_comp_recorded ON competitor_prices(recorded_at DESC);
+CREATE INDEX IF NOT EXISTS idx_comp_product_recorded ON competitor_prices(product_id, recorded_at DESC);
 
 -- Google Trends / market trend signals (FK → products)
 CREATE TABLE IF NOT EXISTS trend_metrics (
@@ -64,3 +65,136 @@ CREATE TABLE IF NOT EXISTS price_recommendations (
     confidence NUMERIC(5,4) CHECK (confidence BETWEEN 0 AND 1),
     created_at TIMESTAMPTZ DEFAULT now()
 );
+
+-- =============================================
+-- RPC functions (called via supabase.rpc)
+-- =============================================
+
+-- Daily average competitor price and units sold for one product,
+-- full-outer-joined on day so callers also see unmatched days
+CREATE OR REPLACE FUNCTION price_demand_pairs(pid UUID, since DATE)
+RETURNS TABLE(day DATE, avg_price NUMERIC, units INT4)
+LANGUAGE SQL STABLE AS $$
+    SELECT COALESCE(s.day, p.day) AS day, p.avg_price, s.units
+    FROM (
+        SELECT sale_date AS day, MAX(units_sold) AS units
+        FROM (
+            SELECT sale_date, units_sold FROM sales_data
+            WHERE product_id = pid AND sale_date >= since
+            ORDER BY sale_date LIMIT 400
+        ) recent
+        GROUP BY sale_date
+    ) s
+    FULL OUTER JOIN (
+        SELECT recorded_at::date AS day, AVG(price) AS avg_price
+        FROM (
+            SELECT price, recorded_at FROM competitor_prices
+            WHERE product_id = pid
+            ORDER BY recorded_at LIMIT 200
+        ) oldest
+        GROUP BY recorded_at::date
+    ) p ON p.day = s.day
+    ORDER BY 1;
+$$;
+
+-- Average of the latest `n` competitor prices for one product
+CREATE OR REPLACE FUNCTION competitor_avg_price(pid UUID, n INT4)
+RETURNS TABLE(avg_price NUMERIC)
+LANGUAGE SQL STABLE AS $$
+    SELECT AVG(price) FROM (
+        SELECT price FROM competitor_prices
+        WHERE product_id = pid
+        ORDER BY recorded_at DESC LIMIT n
+    ) latest;
+$$;
+
+-- Mean, population variance and count of the latest `n` competitor
+-- prices for one product
+CREATE OR REPLACE FUNCTION competitor_price_stats(pid UUID, n INT4)
+RETURNS TABLE(avg_price NUMERIC, var_price NUMERIC, n_prices INT8)
+LANGUAGE SQL STABLE AS $$
+    SELECT AVG(price), VAR_POP(price), COUNT(price) FROM (
+        SELECT price FROM competitor_prices
+        WHERE product_id = pid
+        ORDER BY recorded_at DESC LIMIT n
+    ) latest;
+$$;
+
+-- Latest `n` competitor prices of each product in `pids`, newest first
+CREATE OR REPLACE FUNCTION latest_competitor_prices(pids UUID[], n INT4)
+RETURNS TABLE(product_id UUID, price NUMERIC)
+LANGUAGE SQL STABLE AS $$
+    SELECT product_id, price FROM (
+        SELECT product_id, price, row_number() OVER (
+            PARTITION BY product_id ORDER BY recorded_at DESC
+        ) AS rn
+        FROM competitor_prices
+        WHERE product_id = ANY(pids)
+    ) ranked
+    WHERE rn <= n
+    ORDER BY product_id, rn;
+$$;
+
+-- Latest `n` trend scores of each product in `pids`, newest first
+CREATE OR REPLACE FUNCTION latest_trend_scores(pids UUID[], n INT4)
+RETURNS TABLE(product_id UUID, trend_score NUMERIC)
+LANGUAGE SQL STABLE AS $$
+    SELECT product_id, trend_score FROM (
+        SELECT product_id, trend_score, row_number() OVER (
+            PARTITION BY product_id ORDER BY recorded_at DESC
+        ) AS rn
+        FROM trend_metrics
+        WHERE product_id = ANY(pids)
+    ) ranked
+    WHERE rn <= n
+    ORDER BY product_id, rn;
+$$;
+
+-- Sales rows of each product in `pids` since `since` that the demand and
+-- elasticity signals read: the oldest `head` rows of the window plus the
+-- newest `tail` rows since `recent_since`, oldest first (id breaks ties)
+CREATE OR REPLACE FUNCTION sales_window(
+    pids UUID[], since DATE, head INT4, recent_since DATE, tail INT4
+)
+RETURNS TABLE(product_id UUID, units_sold INT4, sale_date DATE)
+LANGUAGE SQL STABLE AS $$
+    SELECT product_id, units_sold, sale_date FROM (
+        SELECT id, product_id, units_sold, sale_date,
+               sale_date >= recent_since AS recent,
+               row_number() OVER (
+                   PARTITION BY product_id ORDER BY sale_date, id
+               ) AS head_rn,
+               row_number() OVER (
+                   PARTITION BY product_id, sale_date >= recent_since
+                   ORDER BY sale_date DESC, id DESC
+               ) AS tail_rn
+        FROM sales_data
+        WHERE product_id = ANY(pids) AND sale_date >= since
+    ) ranked
+    WHERE head_rn <= head OR (recent AND tail_rn <= tail)
+    ORDER BY product_id, sale_date, id;
+$$;
+
+-- Count and averages of the latest `n` demand forecasts of each product
+-- in `pids`
+CREATE OR REPLACE FUNCTION forecast_stats(pids UUID[], n INT4)
+RETURNS TABLE(product_id UUID, forecast_count INT8, avg_demand NUMERIC, avg_confidence NUMERIC)
+LANGUAGE SQL STABLE AS $$
+    SELECT product_id, COUNT(*), AVG(predicted_demand), AVG(confidence) FROM (
+        SELECT product_id, predicted_demand, confidence, row_number() OVER (
+            PARTITION BY product_id ORDER BY created_at DESC
+        ) AS rn
+        FROM demand_forecasts
+        WHERE product_id = ANY(pids)
+    ) ranked
+    WHERE rn <= n
+    GROUP BY product_id;
+$$;
+
+-- Average daily units sold for one product since a given day
+CREATE OR REPLACE FUNCTION recent_demand_avg(pid UUID, since DATE)
+RETURNS TABLE(avg_units NUMERIC)
+LANGUAGE SQL STABLE AS $$
+    SELECT AVG(units_sold) FROM sales_data
+    WHERE product_id = pid AND sale_date >= since;
+$$;
@@ -1,5 +1,11 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
 
 from api.competitors import router as competitors_router
 from api.analytics import router as analytics_router
@@ -7,12 +13,49 @@ from api.forecasting import router as forecasting_router
 from api.pricing import router as pricing_router
 from api.products import router as products_router
 from api.demo_simulation import router as demo_router
+from models.demand_model import DemandForecaster
+from models.elasticity_model import ElasticityEstimator
+from models.price_optimizer import PriceOptimizer
+from services.decision_engine import DecisionEngine
+from services.feature_engineering import FeatureEngineer
 
 # ── DB Init ──────────────────────────────────────────────────────────
 
 from db.init_db import init_db
 init_db()
 
+# ── Lifespan ─────────────────────────────────────────────────────────
+
+def request_key_builder(func, namespace="", *, request=None, response=None, args, kwargs):
+    """Key cached responses on route + query string, not on injected services."""
+    query = sorted(request.query_params.multi_items()) if request else []
+    return f"{namespace}:{func.__module__}:{func.__name__}:{query}"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Per-worker startup:
+        - response cache: Redis if REDIS_URL is set, else in-process
+        - shared model / engine instances, injected via api.dependencies
+    """
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        from redis import asyncio as aioredis
+        from fastapi_cache.backends.redis import RedisBackend
+
+        backend = RedisBackend(aioredis.from_url(redis_url))
+    else:
+        backend = InMemoryBackend()
+    FastAPICache.init(backend, prefix="pp", key_builder=request_key_builder)
+
+    app.state.engineer = FeatureEngineer()
+    app.state.forecaster = DemandForecaster()
+    app.state.estimator = ElasticityEstimator()
+    app.state.optimizer = PriceOptimizer(app.state.estimator)
+    app.state.engine = DecisionEngine(app.state.engineer)
+    yield
+
 # ── App Init ─────────────────────────────────────────────────────────
 
 app = FastAPI(
@@ -25,6 +68,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # ── CORS ─────────────────────────────────────────────────────────────
@@ -71,14 +115,15 @@ async def root():
 
 
 @app.get("/health", tags=["Health"])
+@cache(expire=5)
 async def health_check():
     """Detailed health check with DB connectivity test."""
-    from db.supabase_client import supabase
+    from db.supabase_client import async_supabase
 
     db_status = "connected"
     try:
-        # Quick query to verify DB connection
-        supabase.table("products").select("id").limit(1).execute()
+        # Count-only query: verifies the connection without shipping rows
+        await async_supabase.table("products").select("id", count="exact", head=True).execute()
     except Exception as e:
         db_status = f"error: {str(e)}"
 
@@ -16,12 +16,16 @@ Usage:
     result = await forecaster.forecast(product_id, horizon_days=14)
 """
 
-import math
 import random
+import asyncio
 import logging
-from datetime import date, datetime, timedelta
+from datetime import date, timedelta
 from typing import Optional
 
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+from core.cache import TTLCache
 from db.supabase_client import supabase
 from db.schemas import DemandForecastCreate
 
@@ -37,6 +41,59 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# Validates a whole horizon of forecasts in one pydantic-core pass
+_FORECAST_LIST = TypeAdapter(list[DemandForecastCreate])
+
+# _store_predictions inserts the rows it validates, so they must carry
+# exactly the schema's fields
+_FORECAST_FIELDS = {"product_id", "predicted_demand", "confidence", "forecast_date"}
+assert set(DemandForecastCreate.model_fields) == _FORECAST_FIELDS
+
+# Latest trend score per product; trends refresh at most hourly
+_trend_scores = TTLCache(maxsize=4096, ttl=300)
+
+# English day names by date.weekday(), independent of the process locale
+_DAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
+
+# ── Smoothing Kernel ─────────────────────────────────────────────────
+
+def _holt_winters(
+    values: list[float], seasonal: list[float], level: float, trend: float,
+    alpha: float, beta: float, gamma: float,
+) -> tuple[float, float, list[float]]:
+    """
+    One Holt-Winters pass over `values`, updating `seasonal` in place.
+
+    Returns the final level and trend plus the one-step-ahead fit for
+    every point. The recurrence is sequential, so it runs over plain
+    floats with every constant bound to a local.
+    """
+    season_length = len(seasonal)
+    keep_alpha, keep_beta, keep_gamma = 1 - alpha, 1 - beta, 1 - gamma
+    fitted = []
+    append = fitted.append
+
+    for i, value in enumerate(values):
+        idx = i % season_length
+        season_factor = seasonal[idx]
+        base = level + trend
+
+        if season_factor > 0:
+            new_level = alpha * (value / season_factor) + keep_alpha * base
+        else:
+            new_level = alpha * value + keep_alpha * base
+
+        trend = beta * (new_level - level) + keep_beta * trend
+
+        if new_level > 0:
+            seasonal[idx] = gamma * (value / new_level) + keep_gamma * season_factor
+
+        append(base * season_factor)
+        level = new_level
+
+    return level, trend, fitted
+
 
 # ── Demand Forecaster ────────────────────────────────────────────────
 
@@ -62,33 +119,37 @@ class DemandForecaster:
         """Fetch historical sales data from Supabase."""
         try:
             cutoff = (date.today() - timedelta(days=days)).isoformat()
-            response = (
+            query = (
                 supabase.table("sales_data")
                 .select("units_sold, sale_date")
                 .eq("product_id", product_id)
                 .gte("sale_date", cutoff)
                 .order("sale_date", desc=False)
                 .limit(500)
-                .execute()
             )
+            response = await asyncio.to_thread(query.execute)
             return response.data or []
         except Exception as e:
             logger.error(f"Failed to fetch sales data: {e}")
             return []
 
     async def _fetch_trend_score(self, product_id: str) -> float:
-        """Get latest trend score as a demand amplifier."""
-        try:
-            response = (
+        """Get latest trend score as a demand amplifier (cached for 5 min)."""
+        async def load() -> Optional[float]:
+            query = (
                 supabase.table("trend_metrics")
                 .select("trend_score")
                 .eq("product_id", product_id)
                 .order("recorded_at", desc=True)
                 .limit(1)
-                .execute()
             )
-            if response.data:
-                return float(response.data[0]["trend_score"])
+            response = await asyncio.to_thread(query.execute)
+            return float(response.data[0]["trend_score"]) if response.data else None
+
+        try:
+            score = await _trend_scores.get_or_load(product_id, load)
+            if score is not None:
+                return score
         except Exception:
             pass
         return 50.0  # neutral default
@@ -99,88 +160,67 @@ class DemandForecaster:
 
         Uses Holt-Winters triple exponential smoothing.
         """
-        n = len(values)
+        v = np.asarray(values, dtype=np.float64)
+        n = len(v)
         if n < season_length * 2:
             # Not enough data for seasonal decomposition
-            level = values[-1] if values else 0
+            level = float(v[-1]) if n else 0
             trend = 0
             if n >= 2:
-                trend = (values[-1] - values[0]) / max(n - 1, 1)
+                trend = float(v[-1] - v[0]) / max(n - 1, 1)
             return {
                 "level": level,
                 "trend": trend,
-                "seasonal": [1.0] * season_length,
+                "seasonal": np.ones(season_length),
                 "residual_std": 0.0,
             }
 
         # Initialize seasonal indices from first full season
-        initial_avg = sum(values[:season_length]) / season_length
-        seasonal = [
-            values[i] / initial_avg if initial_avg > 0 else 1.0
-            for i in range(season_length)
-        ]
+        initial_avg = float(v[:season_length].mean())
+        if initial_avg > 0:
+            seasonal = (v[:season_length] / initial_avg).tolist()
+        else:
+            seasonal = [1.0] * season_length
 
         # Initialize level and trend
         level = initial_avg
-        trend = (
-            sum(values[season_length:2 * season_length]) / season_length - initial_avg
-        ) / season_length
+        trend = (float(v[season_length:2 * season_length].mean()) - initial_avg) / season_length
 
         # Smooth through the series
-        levels = []
-        residuals = []
-        for i in range(n):
-            idx = i % season_length
-            season_factor = seasonal[idx]
-
-            if season_factor > 0:
-                new_level = self.alpha * (values[i] / season_factor) + (1 - self.alpha) * (level + trend)
-            else:
-                new_level = self.alpha * values[i] + (1 - self.alpha) * (level + trend)
-
-            new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
-
-            if new_level > 0:
-                seasonal[idx] = self.gamma * (values[i] / new_level) + (1 - self.gamma) * seasonal[idx]
-
-            fitted = (level + trend) * season_factor
-            residuals.append(values[i] - fitted)
-
-            level = new_level
-            trend = new_trend
-            levels.append(level)
+        level, trend, fitted = _holt_winters(
+            v.tolist(), seasonal, level, trend, self.alpha, self.beta, self.gamma,
+        )
 
         # Residual standard deviation for confidence intervals
-        residual_std = 0.0
-        if len(residuals) > 1:
-            rmean = sum(residuals) / len(residuals)
-            residual_std = math.sqrt(
-                sum((r - rmean) ** 2 for r in residuals) / len(residuals)
-            )
+        residual_std = float((v - np.asarray(fitted)).std())
 
         return {
             "level": level,
             "trend": trend,
-            "seasonal": seasonal,
+            "seasonal": np.asarray(seasonal),
             "residual_std": residual_std,
         }
 
     def _detect_spikes(
-        self, seasonal: list[float], start_date: date, horizon: int,
+        self, seasonal: np.ndarray, start_date: date, horizon: int,
     ) -> list[dict]:
         """Identify dates with unusually high seasonal indices."""
-        spikes = []
-        threshold = max(seasonal) * 0.85 if seasonal else 1.0
+        if not len(seasonal):
+            return []
+
+        # Seasonal index for each day of the horizon, then one mask for
+        # "near the weekly peak and clearly above average"
+        values = seasonal[np.arange(horizon) % len(seasonal)]
+        spike_days = np.flatnonzero((values >= seasonal.max() * 0.85) & (values > 1.1))
 
-        for day in range(horizon):
+        spikes = []
+        for day, index in zip(spike_days.tolist(), values[spike_days].tolist()):
             future_date = start_date + timedelta(days=day)
-            idx = day % len(seasonal)
-            if seasonal[idx] >= threshold and seasonal[idx] > 1.1:
-                spikes.append({
-                    "date": future_date.isoformat(),
-                    "seasonal_index": round(seasonal[idx], 3),
-                    "day_of_week": future_date.strftime("%A"),
-                })
+            spikes.append({
+                "date": future_date.isoformat(),
+                "seasonal_index": round(index, 3),
+                "day_of_week": _DAY_NAMES[future_date.weekday()],
+            })
         return spikes
 
     async def forecast(
@@ -203,7 +243,11 @@ class DemandForecaster:
         """
         horizon_days = max(7, min(30, horizon_days))
 
-        rows = await self._fetch_sales(product_id)
+        # Sales history and the trend score are independent lookups
+        rows, trend_score = await asyncio.gather(
+            self._fetch_sales(product_id),
+            self._fetch_trend_score(product_id),
+        )
         if not rows:
             logger.warning(f"No sales data for product {product_id}")
             return {
@@ -216,10 +260,9 @@ class DemandForecaster:
 
         # Extract demand values
         values = [float(r["units_sold"]) for r in rows]
-        last_date = datetime.strptime(rows[-1]["sale_date"], "%Y-%m-%d").date()
+        last_date = date.fromisoformat(rows[-1]["sale_date"])
 
         # Get trend multiplier
-        trend_score = await self._fetch_trend_score(product_id)
         trend_multiplier = 0.95 + (trend_score / 500)  # 0.95–1.15 range
 
         # Decompose
@@ -229,26 +272,30 @@ class DemandForecaster:
         seasonal = decomp["seasonal"]
         residual_std = decomp["residual_std"]
 
-        # Generate predictions
-        predictions = []
-        for day in range(1, horizon_days + 1):
-            future_date = last_date + timedelta(days=day)
-            idx = (day - 1) % len(seasonal)
+        # Generate predictions — every day depends only on its offset,
+        # so the whole horizon is computed as arrays
+        days = np.arange(1, horizon_days + 1)
+        season = seasonal[(days - 1) % len(seasonal)]
 
-            forecast_val = (level + trend * day) * seasonal[idx] * trend_multiplier
-            forecast_val = max(0, forecast_val)
+        forecast_vals = np.maximum(0, (level + trend * days) * season * trend_multiplier)
 
-            # Confidence interval widens over time
-            uncertainty = residual_std * math.sqrt(day) * 1.96
-            upper = forecast_val + uncertainty
-            lower = max(0, forecast_val - uncertainty)
+        # Confidence interval widens over time
+        uncertainty = residual_std * np.sqrt(days) * 1.96
+        upper = forecast_vals + uncertainty
+        lower = np.maximum(0, forecast_vals - uncertainty)
 
+        # Round with built-in round(): np.round drifts on exact halves
+        predictions = []
+        for day, fc, hi, lo in zip(
+            days.tolist(), forecast_vals.tolist(), upper.tolist(), lower.tolist(),
+        ):
+            future_date = last_date + timedelta(days=day)
             predictions.append({
                 "date": future_date.isoformat(),
-                "predicted_demand": round(forecast_val, 1),
-                "upper_bound": round(upper, 1),
-                "lower_bound": round(lower, 1),
-                "day_of_week": future_date.strftime("%A"),
+                "predicted_demand": round(fc, 1),
+                "upper_bound": round(hi, 1),
+                "lower_bound": round(lo, 1),
+                "day_of_week": _DAY_NAMES[future_date.weekday()],
             })
 
         # Overall confidence: decreases with horizon and residual noise
@@ -286,36 +333,48 @@ class DemandForecaster:
             "stored": stored,
         }
 
-        logger.info(
-            f"✓ Forecast generated: {horizon_days} days, "
-            f"confidence={confidence:.0%}, "
-            f"avg_predicted={sum(p['predicted_demand'] for p in predictions) / len(predictions):.0f}/day, "
-            f"{len(spikes)} spike periods"
-        )
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "✓ Forecast generated: %d days, confidence=%.0f%%, "
+                "avg_predicted=%.0f/day, %d spike periods",
+                horizon_days, confidence * 100, forecast_vals.mean(), len(spikes),
+            )
         return result
 
     async def _store_predictions(
         self, product_id: str, predictions: list[dict], confidence: float,
     ) -> int:
         """Save forecasts to Supabase demand_forecasts table."""
-        records = []
-        for p in predictions:
-            try:
-                validated = DemandForecastCreate(
-                    product_id=product_id,
-                    predicted_demand=p["predicted_demand"],
-                    confidence=confidence,
-                    forecast_date=p["date"],
-                )
-                records.append(validated.model_dump(mode="json"))
-            except Exception as e:
-                logger.warning(f"Validation failed: {e}")
+        rows = [
+            {
+                "product_id": product_id,
+                "predicted_demand": p["predicted_demand"],
+                "confidence": confidence,
+                "forecast_date": p["date"],
+            }
+            for p in predictions
+        ]
+        # The rows are already JSON-ready (ISO date strings, plain floats),
+        # so validation only gates them and they are inserted as built
+        try:
+            _FORECAST_LIST.validate_python(rows)
+            records = rows
+        except ValidationError:
+            # Re-validate row by row so one bad prediction doesn't drop the batch
+            records = []
+            for row in rows:
+                try:
+                    DemandForecastCreate.model_validate(row)
+                    records.append(row)
+                except ValidationError as e:
+                    logger.warning(f"Validation failed: {e}")
 
         if not records:
             return 0
 
         try:
-            response = supabase.table("demand_forecasts").insert(records).execute()
+            query = supabase.table("demand_forecasts").insert(records)
+            response = await asyncio.to_thread(query.execute)
             count = len(response.data) if response.data else 0
             logger.info(f"✓ Stored {count} forecasts in demand_forecasts")
             return count
@@ -327,8 +386,6 @@ class DemandForecaster:
 # ── Standalone test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import asyncio
-
     async def _test():
         forecaster = DemandForecaster()
         # Fetch first product
@@ -15,11 +15,14 @@ Usage:
     result = await estimator.estimate(product_id, your_price)
 """
 
-import math
+import asyncio
 import logging
 from datetime import date, timedelta
 from typing import Optional
 
+import numpy as np
+
+from core.cache import TTLCache
 from db.supabase_client import supabase
 
 # ── Logging ──────────────────────────────────────────────────────────
@@ -34,37 +37,41 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# Base price per product; only changes when a price is applied
+_base_prices = TTLCache(maxsize=4096, ttl=900)
+
 
 # ── Linear Regression Helpers ────────────────────────────────────────
 
-def _linear_regression(x: list[float], y: list[float]) -> dict:
+def _linear_regression(x: np.ndarray, y: np.ndarray) -> dict:
     """
     Simple OLS linear regression: y = a + b·x
 
-    Returns dict with slope, intercept, r2, n.
+    Accepts lists or NumPy arrays.  Returns dict with slope, intercept, r2, n.
     """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
     n = len(x)
     if n < 3 or len(y) != n:
         return {"slope": 0.0, "intercept": 0.0, "r2": 0.0, "n": n}
 
-    sum_x = sum(x)
-    sum_y = sum(y)
-    sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-    sum_xx = sum(xi * xi for xi in x)
+    sum_x = x.sum()
+    sum_y = y.sum()
+    sum_xy = x @ y
+    sum_xx = x @ x
 
     denom = n * sum_xx - sum_x * sum_x
     if abs(denom) < 1e-10:
-        return {"slope": 0.0, "intercept": sum_y / n, "r2": 0.0, "n": n}
+        return {"slope": 0.0, "intercept": float(sum_y / n), "r2": 0.0, "n": n}
 
-    slope = (n * sum_xy - sum_x * sum_y) / denom
-    intercept = (sum_y - slope * sum_x) / n
+    slope = float((n * sum_xy - sum_x * sum_y) / denom)
+    intercept = float((sum_y - slope * sum_x) / n)
 
     # R² calculation
-    y_mean = sum_y / n
-    ss_tot = sum((yi - y_mean) ** 2 for yi in y)
-    ss_res = sum((yi - (intercept + slope * xi)) ** 2 for xi, yi in zip(x, y))
+    ss_tot = ((y - sum_y / n) ** 2).sum()
+    ss_res = ((y - (intercept + slope * x)) ** 2).sum()
 
-    r2 = 1.0 - (ss_res / ss_tot) if ss_tot > 0 else 0.0
+    r2 = float(1.0 - (ss_res / ss_tot)) if ss_tot > 0 else 0.0
 
     return {"slope": slope, "intercept": intercept, "r2": max(0.0, r2), "n": n}
 
@@ -80,83 +87,69 @@ class ElasticityEstimator:
 
     async def _fetch_price_demand_pairs(
         self, product_id: str, days: int = 180,
-    ) -> list[tuple[float, float]]:
+    ) -> np.ndarray:
         """
         Construct (price, demand) pairs by joining competitor_prices
         and sales_data on date proximity.
+
+        Returns an (N, 2) array of [avg_price, units_sold] rows.
         """
         cutoff = (date.today() - timedelta(days=days)).isoformat()
+        no_pairs = np.empty((0, 2))
 
+        # Joined and aggregated per day in the database: one round trip
+        # instead of shipping raw sales and price rows to join here
         try:
-            sales = (
-                supabase.table("sales_data")
-                .select("units_sold, sale_date")
-                .eq("product_id", product_id)
-                .gte("sale_date", cutoff)
-                .order("sale_date", desc=False)
-                .limit(400)
-                .execute()
-            ).data or []
-
-            prices = (
-                supabase.table("competitor_prices")
-                .select("price, recorded_at")
-                .eq("product_id", product_id)
-                .order("recorded_at", desc=False)
-                .limit(200)
-                .execute()
-            ).data or []
+            query = supabase.rpc(
+                "price_demand_pairs", {"pid": product_id, "since": cutoff},
+            )
+            rows = (await asyncio.to_thread(query.execute)).data or []
         except Exception as e:
-            logger.error(f"Failed to fetch data: {e}")
-            return []
-
-        if not sales or not prices:
-            return []
-
-        # Build daily demand map
-        demand_by_date = {}
-        for s in sales:
-            demand_by_date[s["sale_date"]] = int(s["units_sold"])
-
-        # Build daily price map (use date portion of recorded_at)
-        price_by_date = {}
-        for p in prices:
-            day = p["recorded_at"][:10]  # extract YYYY-MM-DD
-            price_by_date.setdefault(day, []).append(float(p["price"]))
-
-        # Average prices per day
-        avg_price_by_date = {
-            day: sum(vals) / len(vals)
-            for day, vals in price_by_date.items()
-        }
-
-        # Join on date
-        pairs = []
-        for d, demand in demand_by_date.items():
-            if d in avg_price_by_date and demand > 0 and avg_price_by_date[d] > 0:
-                pairs.append((avg_price_by_date[d], float(demand)))
-
-        # If not enough date-matched pairs, use synthetic pairing
+            logger.error("Failed to fetch data: %s", e)
+            return no_pairs
+
+        # One row per day; NaN where the day has no price or no sales
+        table = np.array([(r["avg_price"], r["units"]) for r in rows], dtype=np.float64)
+        if not len(table):
+            return no_pairs
+        prices, demands = table[:, 0], table[:, 1]
+        has_price = ~np.isnan(prices)
+        has_demand = ~np.isnan(demands)
+        if not has_price.any() or not has_demand.any():
+            return no_pairs
+
+        # Days with both a sale and a competitor price
+        pairs = table[(prices > 0) & (demands > 0)]
+
+        # If not enough date-matched pairs, use synthetic pairing of the
+        # n lowest prices with the n highest demands; partition first so
+        # only those n values get sorted
         if len(pairs) < 10:
-            avg_prices = sorted(avg_price_by_date.values())
-            demands = sorted(demand_by_date.values(), reverse=True)
-            n = min(len(avg_prices), len(demands))
-            pairs = list(zip(avg_prices[:n], [float(d) for d in demands[:n]]))
+            avg_prices = prices[has_price]
+            units = demands[has_demand]
+            n = min(len(avg_prices), len(units))
+            avg_prices = np.sort(np.partition(avg_prices, n - 1)[:n])
+            units = -np.sort(np.partition(-units, n - 1)[:n])
+            pairs = np.column_stack((avg_prices, units))
 
         return pairs
 
     async def _fetch_product_price(self, product_id: str) -> float:
-        """Get the base price from products table."""
-        try:
-            response = (
+        """Get the base price from products table (cached for 15 min)."""
+        async def load() -> Optional[float]:
+            query = (
                 supabase.table("products")
                 .select("base_price")
                 .eq("id", product_id)
-                .limit(1)
-                .execute()
+                .maybe_single()
             )
-            if response.data:
-                return float(response.data[0]["base_price"])
+            response = await asyncio.to_thread(query.execute)
+            return float(response.data["base_price"]) if response and response.data else None
+
+        try:
+            price = await _base_prices.get_or_load(product_id, load)
+            if price is not None:
+                return price
         except Exception:
             pass
         return 100.0  # fallback
@@ -179,12 +172,13 @@ class ElasticityEstimator:
         pairs = await self._fetch_price_demand_pairs(product_id)
 
         if len(pairs) < 5:
-            logger.warning(f"Insufficient data for elasticity ({len(pairs)} pairs)")
+            logger.warning("Insufficient data for elasticity (%d pairs)", len(pairs))
             return self._default_result(product_id, your_price)
 
         # Log-log regression: log(demand) = a + ε·log(price)
-        log_prices = [math.log(p) for p, _ in pairs]
-        log_demands = [math.log(d) for _, d in pairs]
+        logs = np.log(pairs)
+        log_prices = logs[:, 0]
+        log_demands = logs[:, 1]
 
         reg = _linear_regression(log_prices, log_demands)
         elasticity = round(reg["slope"], 4)
@@ -232,8 +226,8 @@ class ElasticityEstimator:
         }
 
         logger.info(
-            f"✓ Elasticity estimated: ε={elasticity}, sensitivity={sensitivity}, "
-            f"R²={r2}, optimal=[{optimal_min}–{optimal_max}]"
+            "✓ Elasticity estimated: ε=%s, sensitivity=%s, R²=%s, optimal=[%s–%s]",
+            elasticity, sensitivity, r2, optimal_min, optimal_max,
         )
         return result
 
@@ -244,18 +238,19 @@ class ElasticityEstimator:
         Generate price-demand-revenue curve for visualization.
         Sweeps price from 60% to 150% of base price.
         """
-        curve = []
-        for pct in range(60, 155, 5):
-            price = round(base_price * pct / 100, 2)
-            log_demand = intercept + elasticity * math.log(price) if price > 0 else 0
-            demand = max(0, round(math.exp(log_demand)))
-            revenue = round(price * demand, 2)
-            curve.append({
-                "price": price,
-                "demand": demand,
-                "revenue": revenue,
-            })
-        return curve
+        pcts = np.arange(60, 155, 5, dtype=np.float64)
+        # Round to cents with built-in round(): np.round scales by 100
+        # first and drifts a cent on half-cent prices
+        prices = np.array([round(p, 2) for p in (base_price * pcts / 100).tolist()])
+        positive = prices > 0
+        log_demand = np.where(
+            positive, intercept + elasticity * np.log(np.where(positive, prices, 1.0)), 0.0,
+        )
+        demands = np.maximum(0, np.rint(np.exp(log_demand))).astype(np.int64)
+        return [
+            {"price": price, "demand": demand, "revenue": round(price * demand, 2)}
+            for price, demand in zip(prices.tolist(), demands.tolist())
+        ]
 
     def _default_result(self, product_id: str, your_price: float) -> dict:
         """Return a default result when data is insufficient."""
@@ -278,8 +273,6 @@ class ElasticityEstimator:
 # ── Standalone test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import asyncio
-
     async def _test():
         estimator = ElasticityEstimator()
         products = supabase.table("products").select("id, name, base_price").limit(1).execute()
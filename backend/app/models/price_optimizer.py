@@ -16,11 +16,14 @@ Usage:
     result = await optimizer.optimize(product_id)
 """
 
-import math
+import asyncio
 import logging
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from typing import Optional
 
+import numpy as np
+
+from core.cache import TTLCache
 from db.supabase_client import supabase
 from db.schemas import PriceRecommendationCreate
 from models.elasticity_model import ElasticityEstimator
@@ -37,6 +40,11 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# Optimizer inputs that dashboards re-request for the same product
+_products = TTLCache(maxsize=4096, ttl=60)
+_competitor_avgs = TTLCache(maxsize=4096, ttl=30)
+_recent_demand = TTLCache(maxsize=4096, ttl=30)
+
 
 # ── Price Optimizer ──────────────────────────────────────────────────
 
@@ -46,55 +54,60 @@ class PriceOptimizer:
     considering competitor positioning and demand elasticity.
     """
 
+    def __init__(self, estimator: Optional[ElasticityEstimator] = None):
+        self.estimator = estimator or ElasticityEstimator()
+
     async def _fetch_product(self, product_id: str) -> dict:
-        """Get product details from products table."""
-        try:
-            response = (
+        """Get product details from products table (cached for 60 s)."""
+        async def load() -> Optional[dict]:
+            query = (
                 supabase.table("products")
                 .select("id, name, base_price")
                 .eq("id", product_id)
-                .limit(1)
-                .execute()
+                .maybe_single()
             )
-            if response.data:
-                return response.data[0]
+            response = await asyncio.to_thread(query.execute)
+            return response.data if response else None
+
+        try:
+            product = await _products.get_or_load(product_id, load)
+            if product is not None:
+                return product
         except Exception as e:
-            logger.error(f"Failed to fetch product: {e}")
+            logger.error("Failed to fetch product: %s", e)
         return {"id": product_id, "name": "Unknown", "base_price": 100.0}
 
     async def _fetch_competitor_avg(self, product_id: str) -> float:
-        """Get average competitor price."""
+        """Get average of the latest 50 competitor prices (cached for 30 s)."""
+        async def load() -> Optional[float]:
+            query = supabase.rpc("competitor_avg_price", {"pid": product_id, "n": 50})
+            response = await asyncio.to_thread(query.execute)
+            if response.data and response.data[0]["avg_price"] is not None:
+                return round(float(response.data[0]["avg_price"]), 2)
+            return None
+
         try:
-            response = (
-                supabase.table("competitor_prices")
-                .select("price")
-                .eq("product_id", product_id)
-                .order("recorded_at", desc=True)
-                .limit(50)
-                .execute()
-            )
-            if response.data:
-                prices = [float(r["price"]) for r in response.data]
-                return round(sum(prices) / len(prices), 2)
+            avg = await _competitor_avgs.get_or_load(product_id, load)
+            if avg is not None:
+                return avg
         except Exception:
             pass
         return 0.0
 
     async def _fetch_recent_demand(self, product_id: str) -> float:
-        """Get average daily demand from last 14 days."""
-        try:
-            from datetime import date, timedelta
+        """Get average daily demand from last 14 days (cached for 30 s)."""
+        async def load() -> Optional[float]:
             cutoff = (date.today() - timedelta(days=14)).isoformat()
-            response = (
-                supabase.table("sales_data")
-                .select("units_sold")
-                .eq("product_id", product_id)
-                .gte("sale_date", cutoff)
-                .execute()
-            )
-            if response.data:
-                units = [int(r["units_sold"]) for r in response.data]
-                return round(sum(units) / max(len(units), 1), 1)
+            query = supabase.rpc("recent_demand_avg", {"pid": product_id, "since": cutoff})
+            response = await asyncio.to_thread(query.execute)
+            if response.data and response.data[0]["avg_units"] is not None:
+                return round(float(response.data[0]["avg_units"]), 1)
+            return None
+
+        try:
+            demand = await _recent_demand.get_or_load(product_id, load)
+            if demand is not None:
+                return demand
         except Exception:
             pass
         return 50.0
@@ -115,8 +128,12 @@ class PriceOptimizer:
                 "optimal_revenue": 0,
             }
 
-        # Find peak revenue point
-        best = max(elasticity_curve, key=lambda p: p["revenue"])
+        # Find peak revenue point (argmax keeps the first on ties, like max)
+        revenue = np.fromiter(
+            (p["revenue"] for p in elasticity_curve),
+            dtype=np.float64, count=len(elasticity_curve),
+        )
+        best = elasticity_curve[int(np.argmax(revenue))]
 
         return {
             "optimal_price": best["price"],
@@ -134,18 +151,6 @@ class PriceOptimizer:
     ) -> list[dict]:
         """Generate 4 pricing scenarios with impact analysis."""
         scenarios = []
-
-        # Helper: estimate demand at a price point
-        def demand_at(price: float) -> float:
-            if current_price <= 0:
-                return avg_demand
-            ratio = price / current_price
-            return max(0, avg_demand * (ratio ** elasticity))
-
-        def revenue_at(price: float) -> float:
-            return price * demand_at(price)
-
-        current_revenue = revenue_at(current_price)
         current_demand = avg_demand
 
         configs = [
@@ -175,21 +180,34 @@ class PriceOptimizer:
             },
         ]
 
-        for cfg in configs:
-            p = cfg["price"]
-            d = demand_at(p)
-            r = revenue_at(p)
-            rev_delta = r - current_revenue
-            demand_delta = ((d - current_demand) / current_demand * 100) if current_demand > 0 else 0
-            margin_delta = ((p - current_price) / current_price * 100) if current_price > 0 else 0
+        # Demand and revenue at the current price (index 0) and at each
+        # scenario price, in one vectorized pass; the zero-price and
+        # zero-demand guards are checked once, not per scenario
+        prices = np.array([current_price] + [cfg["price"] for cfg in configs])
+        no_change = np.zeros(len(configs))
+        if current_price <= 0:
+            demands = np.full_like(prices, avg_demand)
+            margin_deltas = no_change
+        else:
+            demands = np.maximum(0, avg_demand * np.power(prices / current_price, elasticity))
+            margin_deltas = (prices[1:] - current_price) / current_price * 100
+        revenues = prices * demands
+        rev_deltas = revenues[1:] - revenues[0]
+        if current_demand > 0:
+            demand_deltas = (demands[1:] - current_demand) / current_demand * 100
+        else:
+            demand_deltas = no_change
 
+        for cfg, rev_delta, demand_delta, margin_delta in zip(
+            configs, rev_deltas.tolist(), demand_deltas.tolist(), margin_deltas.tolist(),
+        ):
             scenarios.append({
                 "id": cfg["id"],
                 "name": cfg["name"],
-                "price": p,
+                "price": cfg["price"],
                 "revenue": f"{'+' if rev_delta >= 0 else ''}${abs(rev_delta / 1000):.0f}K",
-                "demand": f"{'+' if demand_delta >= 0 else ''}{demand_delta:.1f}%",
-                "margin": f"{'+' if margin_delta >= 0 else ''}{margin_delta:.1f}%",
+                "demand": f"{demand_delta:+.1f}%",
+                "margin": f"{margin_delta:+.1f}%",
                 "risk": cfg["risk"],
             })
 
@@ -207,14 +225,54 @@ class PriceOptimizer:
             dict with optimal_price, scenarios, elasticity data,
             revenue impact, and confidence.
         """
-        product = await self._fetch_product(product_id)
+        result, record = await self._optimize(product_id, save_to_db)
+        if record is not None:
+            result["stored"] = await self.store_recommendations_bulk([record])
+        return result
+
+    async def optimize_many(
+        self,
+        product_ids: list[str],
+        save_to_db: bool = True,
+    ) -> list[dict]:
+        """
+        Run price optimization for several products, saving all of
+        their recommendations with a single insert.
+
+        Returns:
+            list of optimization dicts, in the same order as product_ids.
+        """
+        outcomes = await asyncio.gather(
+            *(self._optimize(pid, save_to_db) for pid in product_ids)
+        )
+
+        pending = [(result, record) for result, record in outcomes if record is not None]
+        if pending:
+            stored = await self.store_recommendations_bulk([record for _, record in pending])
+            if stored == len(pending):
+                for result, _ in pending:
+                    result["stored"] = 1
+
+        return [result for result, _ in outcomes]
+
+    async def _optimize(
+        self, product_id: str, save_to_db: bool,
+    ) -> tuple[dict, Optional[dict]]:
+        """
+        Compute the optimization result for a product, plus the
+        validated price_recommendations row to save (None if there is
+        nothing to save).
+        """
+        # Product, competitor and demand lookups are independent
+        product, competitor_avg, avg_demand = await asyncio.gather(
+            self._fetch_product(product_id),
+            self._fetch_competitor_avg(product_id),
+            self._fetch_recent_demand(product_id),
+        )
         current_price = float(product["base_price"])
-        competitor_avg = await self._fetch_competitor_avg(product_id)
-        avg_demand = await self._fetch_recent_demand(product_id)
 
         # Get elasticity analysis
-        estimator = ElasticityEstimator()
-        elasticity_result = await estimator.estimate(product_id, current_price)
+        elasticity_result = await self.estimator.estimate(product_id, current_price)
 
         elasticity = elasticity_result["elasticity_coefficient"]
         curve = elasticity_result.get("elasticity_curve", [])
@@ -249,10 +307,10 @@ class PriceOptimizer:
             current_price, optimal_price, competitor_avg, elasticity, avg_demand,
         )
 
-        # Save recommendation to DB
-        stored = 0
+        # Recommendation row to save to DB
+        record = None
         if save_to_db and optimal_daily_revenue > 0:
-            stored = await self._store_recommendation(
+            record = self._build_recommendation(
                 product_id, optimal_price, optimal_daily_revenue * 30, confidence,
             )
 
@@ -264,54 +322,59 @@ class PriceOptimizer:
             "competitor_avg": competitor_avg if competitor_avg > 0 else current_price * 1.05,
             "confidence": confidence,
             "revenue_impact": f"{'+'if monthly_impact >= 0 else ''}${abs(monthly_impact / 1000):.0f}K",
-            "revenue_impact_pct": f"{'+'if revenue_impact_pct >= 0 else ''}{revenue_impact_pct:.1f}%",
-            "demand_change": f"{'+'if demand_change >= 0 else ''}{demand_change:.1f}%",
-            "margin_improvement": f"{'+'if margin_improvement >= 0 else ''}{margin_improvement:.1f}%",
+            "revenue_impact_pct": f"{revenue_impact_pct:+.1f}%",
+            "demand_change": f"{demand_change:+.1f}%",
+            "margin_improvement": f"{margin_improvement:+.1f}%",
             "elasticity": elasticity_result,
             "scenarios": scenarios,
             "elasticity_curve": curve,
-            "stored": stored,
+            "stored": 0,
         }
 
         logger.info(
-            f"✓ Optimization complete: optimal=${optimal_price}, "
-            f"confidence={confidence:.0%}, impact={result['revenue_impact']}"
+            "✓ Optimization complete: optimal=$%s, confidence=%.0f%%, impact=%s",
+            optimal_price, confidence * 100, result["revenue_impact"],
         )
-        return result
+        return result, record
 
-    async def _store_recommendation(
+    def _build_recommendation(
         self,
         product_id: str,
         recommended_price: float,
         expected_revenue_change: float,
         confidence: float,
-    ) -> int:
-        """Save price recommendation to Supabase."""
+    ) -> dict:
+        """
+        Build an insertable price recommendation row without re-running
+        validation: optimize() only calls this with a positive price and
+        revenue and a confidence clamped to [0.5, 0.98].  The Rounded2
+        fields are rounded here, as the validator would.
+        """
+        return PriceRecommendationCreate.model_construct(
+            product_id=product_id,
+            recommended_price=round(recommended_price, 2),
+            expected_revenue_change=round(expected_revenue_change, 2),
+            confidence=confidence,
+        ).model_dump()
+
+    async def store_recommendations_bulk(self, records: list[dict]) -> int:
+        """Save price recommendation rows to Supabase in one insert."""
+        if not records:
+            return 0
         try:
-            validated = PriceRecommendationCreate(
-                product_id=product_id,
-                recommended_price=recommended_price,
-                expected_revenue_change=expected_revenue_change,
-                confidence=confidence,
-            )
-            response = (
-                supabase.table("price_recommendations")
-                .insert(validated.model_dump())
-                .execute()
-            )
+            query = supabase.table("price_recommendations").insert(records)
+            response = await asyncio.to_thread(query.execute)
             count = len(response.data) if response.data else 0
-            logger.info(f"✓ Stored {count} recommendation in price_recommendations")
+            logger.info("✓ Stored %d recommendation(s) in price_recommendations", count)
             return count
         except Exception as e:
-            logger.error(f"✗ Supabase insert failed: {e}")
+            logger.error("✗ Supabase insert failed: %s", e)
             return 0
 
 
 # ── Standalone test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import asyncio
-
     async def _test():
         optimizer = PriceOptimizer()
         products = supabase.table("products").select("id, name").limit(1).execute()
@@ -15,10 +15,13 @@ Usage:
     result = await engine.evaluate(product_id)
 """
 
+import asyncio
 import logging
 from datetime import datetime, timezone
 from typing import Optional
 
+import numpy as np
+
 from db.supabase_client import supabase
 from services.feature_engineering import FeatureEngineer
 
@@ -89,6 +92,189 @@ RULES = [
 ]
 
 
+# ── Rule Predicates & Builders ───────────────────────────────────────
+
+def _rule_signals(signals: dict) -> dict:
+    """Signal values the rules read, with defaults filled in once."""
+    return {
+        "position": signals.get("price_position_index", 1.0),
+        "growth": signals.get("demand_growth_rate", 0.0),
+        "momentum": signals.get("trend_momentum", 0.0),
+        "volatility": signals.get("price_volatility", "low"),
+        "seasonal": signals.get("seasonal_index", 1.0),
+    }
+
+
+def _build_competitor_undercut(s: dict) -> dict:
+    # Rule 1: Competitor Undercut — your price is >10% above market
+    position = s["position"]
+    pct = round((position - 1.0) * 100, 1)
+    return {
+        "type": "decrease",
+        "title": f"Reduce price by {pct:.0f}% to match market",
+        "description": (
+            f"Your price is {pct:.1f}% above competitor average. "
+            f"Market volatility is {s['volatility']}. Adjust to maintain competitiveness."
+        ),
+        "impact": f"-{pct:.0f}%",
+        "confidence": min(95, 70 + int(pct * 2)),
+        "urgency": "High",
+        "rule": "Competitor Undercut Response",
+        "input": f"position_index={position:.2f}",
+    }
+
+
+def _build_demand_surge(s: dict) -> dict:
+    # Rule 2: Demand Surge — rising demand + rising trends
+    growth, momentum = s["growth"], s["momentum"]
+    increase = min(8, max(3, int(growth * 30)))
+    return {
+        "type": "increase",
+        "title": f"Increase price by {increase}%",
+        "description": (
+            f"Demand growing at {growth:.0%} with trend momentum of {momentum:.0f}. "
+            f"Market interest is accelerating — safe to capture margin."
+        ),
+        "impact": f"+{increase}%",
+        "confidence": min(95, 65 + int(momentum)),
+        "urgency": "High",
+        "rule": "Demand Surge Capture",
+        "input": f"growth={growth:.2f}, momentum={momentum:.0f}",
+    }
+
+
+def _build_low_demand(s: dict) -> dict:
+    # Rule 3: Low Demand — falling demand
+    growth = s["growth"]
+    discount = min(15, max(5, int(abs(growth) * 50)))
+    return {
+        "type": "discount",
+        "title": f"Offer {discount}% discount",
+        "description": (
+            f"Demand falling at {growth:.0%}. "
+            f"A targeted discount could stabilize sales and capture market share."
+        ),
+        "impact": f"+{discount * 2}% volume",
+        "confidence": min(90, 60 + int(abs(growth) * 100)),
+        "urgency": "Medium",
+        "rule": "Low Demand Guard",
+        "input": f"growth={growth:.2f}",
+    }
+
+
+def _build_seasonal_discount(s: dict) -> dict:
+    # Rule 4: Seasonal Discount — low season + falling demand
+    growth, seasonal = s["growth"], s["seasonal"]
+    return {
+        "type": "discount",
+        "title": "Apply seasonal discount (10-15%)",
+        "description": (
+            f"Seasonal index at {seasonal:.2f} (below normal). "
+            f"Demand is declining — a seasonal promotion can maintain volume."
+        ),
+        "impact": "+12% volume",
+        "confidence": min(85, 55 + int((1 - seasonal) * 200)),
+        "urgency": "Medium",
+        "rule": "Seasonal Discount Window",
+        "input": f"seasonal={seasonal:.2f}, growth={growth:.2f}",
+    }
+
+
+def _build_trend_surge(s: dict) -> dict:
+    # Rule 5: Trend Surge Preparation — trends rising but demand hasn't caught up
+    growth, momentum = s["growth"], s["momentum"]
+    return {
+        "type": "stock",
+        "title": "Prepare for demand surge",
+        "description": (
+            f"Trend momentum at +{momentum:.0f} but demand hasn't surged yet. "
+            f"Historical pattern suggests imminent demand spike. Increase stock."
+        ),
+        "impact": "+20-40% demand expected",
+        "confidence": min(88, 60 + int(momentum * 1.5)),
+        "urgency": "High",
+        "rule": "Trend Surge Preparation",
+        "input": f"momentum={momentum:.0f}, growth={growth:.2f}",
+    }
+
+
+def _build_margin_floor(s: dict) -> dict:
+    # Rule 6: Margin Floor — your price is too low
+    position = s["position"]
+    pct = round((1.0 - position) * 100, 1)
+    return {
+        "type": "increase",
+        "title": f"Raise price — {pct:.0f}% below market",
+        "description": (
+            f"Your price is {pct:.1f}% below competitor average. "
+            f"This may erode margins without capturing proportional volume."
+        ),
+        "impact": f"+{pct:.0f}% margin",
+        "confidence": min(97, 80 + int(pct)),
+        "urgency": "Critical",
+        "rule": "Margin Floor Protection",
+        "input": f"position_index={position:.2f}",
+    }
+
+
+# Recommendation returned when no rule triggers; callers get a copy
+HOLD_RECOMMENDATION = {
+    "type": "hold",
+    "title": "Maintain current pricing",
+    "description": (
+        "All indicators are within normal ranges. "
+        "No action required at this time."
+    ),
+    "impact": "Stable",
+    "confidence": 92,
+    "urgency": "Low",
+    "rule": "Default Assessment",
+    "input": "All signals normal",
+}
+
+
+# Signals the trigger predicates compare; stacked into arrays to
+# check one rule across many products at once
+_TRIGGER_SIGNALS = ("position", "growth", "momentum", "seasonal")
+
+# (rule id, rule name, trigger predicate, recommendation builder),
+# in evaluation order; names come from RULES.  Predicates combine
+# comparisons with & so they work on scalars and on NumPy arrays.
+_RULE_NAMES = {rule["id"]: rule["name"] for rule in RULES}
+COMPILED_RULES = tuple(
+    (rule_id, _RULE_NAMES[rule_id], predicate, build)
+    for rule_id, predicate, build in (
+        (1, lambda s: s["position"] > 1.10, _build_competitor_undercut),
+        (2, lambda s: (s["growth"] > 0.15) & (s["momentum"] > 10), _build_demand_surge),
+        (3, lambda s: s["growth"] < -0.15, _build_low_demand),
+        (4, lambda s: (s["seasonal"] < 0.9) & (s["growth"] < 0), _build_seasonal_discount),
+        (5, lambda s: (s["momentum"] > 15) & (s["growth"] < 0.05), _build_trend_surge),
+        (6, lambda s: s["position"] < 0.85, _build_margin_floor),
+    )
+)
+
+
+# Decision-log input summary per rule id, filled from _log_inputs()
+RULE_INPUT_FORMATS = {
+    1: "position={position:.2f}",
+    2: "growth={growth:.2f}, momentum={momentum:.0f}",
+    3: "growth={growth:.2f}",
+    4: "seasonal={seasonal:.2f}",
+    5: "momentum={momentum:.0f}, growth={growth:.2f}",
+    6: "position={position:.2f}",
+}
+
+
+def _log_inputs(signals: dict) -> dict:
+    """Signal values the decision log reports (missing ones as 0)."""
+    return {
+        "position": signals.get("price_position_index", 0),
+        "growth": signals.get("demand_growth_rate", 0),
+        "momentum": signals.get("trend_momentum", 0),
+        "seasonal": signals.get("seasonal_index", 0),
+    }
+
+
 # ── Decision Engine ──────────────────────────────────────────────────
 
 class DecisionEngine:
@@ -97,191 +283,81 @@ class DecisionEngine:
     and generates actionable pricing recommendations.
     """
 
-    def __init__(self):
-        self.engineer = FeatureEngineer()
+    def __init__(self, engineer: Optional[FeatureEngineer] = None):
+        self.engineer = engineer or FeatureEngineer()
 
     def _evaluate_rules(self, signals: dict) -> list[dict]:
         """
         Evaluate all rules against current signals and return
         triggered recommendations.
         """
-        recommendations = []
-        now = datetime.now(timezone.utc).strftime("%H:%M:%S")
-
-        position = signals.get("price_position_index", 1.0)
-        growth = signals.get("demand_growth_rate", 0.0)
-        momentum = signals.get("trend_momentum", 0.0)
-        acceleration = signals.get("trend_acceleration", 0.0)
-        volatility = signals.get("price_volatility", "low")
-        elasticity = signals.get("elasticity_label", "medium")
-        seasonal = signals.get("seasonal_index", 1.0)
-
-        # Rule 1: Competitor Undercut — your price is >10% above market
-        if position > 1.10:
-            pct = round((position - 1.0) * 100, 1)
-            confidence = min(95, 70 + int(pct * 2))
-            recommendations.append({
-                "type": "decrease",
-                "title": f"Reduce price by {pct:.0f}% to match market",
-                "description": (
-                    f"Your price is {pct:.1f}% above competitor average. "
-                    f"Market volatility is {volatility}. Adjust to maintain competitiveness."
-                ),
-                "impact": f"-{pct:.0f}%",
-                "confidence": confidence,
-                "urgency": "High",
-                "rule": "Competitor Undercut Response",
-                "input": f"position_index={position:.2f}",
-            })
-
-        # Rule 2: Demand Surge — rising demand + rising trends
-        if growth > 0.15 and momentum > 10:
-            increase = min(8, max(3, int(growth * 30)))
-            confidence = min(95, 65 + int(momentum))
-            recommendations.append({
-                "type": "increase",
-                "title": f"Increase price by {increase}%",
-                "description": (
-                    f"Demand growing at {growth:.0%} with trend momentum of {momentum:.0f}. "
-                    f"Market interest is accelerating — safe to capture margin."
-                ),
-                "impact": f"+{increase}%",
-                "confidence": confidence,
-                "urgency": "High",
-                "rule": "Demand Surge Capture",
-                "input": f"growth={growth:.2f}, momentum={momentum:.0f}",
-            })
+        # No signals: every rule would see its neutral default
+        if not signals:
+            return [dict(HOLD_RECOMMENDATION)]
 
-        # Rule 3: Low Demand — falling demand
-        if growth < -0.15:
-            discount = min(15, max(5, int(abs(growth) * 50)))
-            confidence = min(90, 60 + int(abs(growth) * 100))
-            recommendations.append({
-                "type": "discount",
-                "title": f"Offer {discount}% discount",
-                "description": (
-                    f"Demand falling at {growth:.0%}. "
-                    f"A targeted discount could stabilize sales and capture market share."
-                ),
-                "impact": f"+{discount * 2}% volume",
-                "confidence": confidence,
-                "urgency": "Medium",
-                "rule": "Low Demand Guard",
-                "input": f"growth={growth:.2f}",
-            })
-
-        # Rule 4: Seasonal Discount — low season + falling demand
-        if seasonal < 0.9 and growth < 0:
-            confidence = min(85, 55 + int((1 - seasonal) * 200))
-            recommendations.append({
-                "type": "discount",
-                "title": "Apply seasonal discount (10-15%)",
-                "description": (
-                    f"Seasonal index at {seasonal:.2f} (below normal). "
-                    f"Demand is declining — a seasonal promotion can maintain volume."
-                ),
-                "impact": "+12% volume",
-                "confidence": confidence,
-                "urgency": "Medium",
-                "rule": "Seasonal Discount Window",
-                "input": f"seasonal={seasonal:.2f}, growth={growth:.2f}",
-            })
+        s = _rule_signals(signals)
+        recommendations = [
+            build(s) for _rule_id, _name, predicate, build in COMPILED_RULES
+            if predicate(s)
+        ]
 
-        # Rule 5: Trend Surge Preparation — trends rising but demand hasn't caught up
-        if momentum > 15 and growth < 0.05:
-            confidence = min(88, 60 + int(momentum * 1.5))
-            recommendations.append({
-                "type": "stock",
-                "title": "Prepare for demand surge",
-                "description": (
-                    f"Trend momentum at +{momentum:.0f} but demand hasn't surged yet. "
-                    f"Historical pattern suggests imminent demand spike. Increase stock."
-                ),
-                "impact": "+20-40% demand expected",
-                "confidence": confidence,
-                "urgency": "High",
-                "rule": "Trend Surge Preparation",
-                "input": f"momentum={momentum:.0f}, growth={growth:.2f}",
-            })
+        # If no rules triggered, add a HOLD recommendation
+        return recommendations or [dict(HOLD_RECOMMENDATION)]
 
-        # Rule 6: Margin Floor — your price is too low
-        if position < 0.85:
-            pct = round((1.0 - position) * 100, 1)
-            confidence = min(97, 80 + int(pct))
-            recommendations.append({
-                "type": "increase",
-                "title": f"Raise price — {pct:.0f}% below market",
-                "description": (
-                    f"Your price is {pct:.1f}% below competitor average. "
-                    f"This may erode margins without capturing proportional volume."
-                ),
-                "impact": f"+{pct:.0f}% margin",
-                "confidence": confidence,
-                "urgency": "Critical",
-                "rule": "Margin Floor Protection",
-                "input": f"position_index={position:.2f}",
-            })
+    def _evaluate_rules_many(self, all_signals: list[dict]) -> list[list[dict]]:
+        """
+        Evaluate all rules for many products at once. Each trigger is
+        checked across every product in one NumPy comparison; only the
+        triggered (product, rule) pairs build recommendations.
+        """
+        projected = [_rule_signals(signals) for signals in all_signals]
+        if not projected:
+            return []
 
-        # If no rules triggered, add a HOLD recommendation
-        if not recommendations:
-            recommendations.append({
-                "type": "hold",
-                "title": "Maintain current pricing",
-                "description": (
-                    "All indicators are within normal ranges. "
-                    "No action required at this time."
-                ),
-                "impact": "Stable",
-                "confidence": 92,
-                "urgency": "Low",
-                "rule": "Default Assessment",
-                "input": "All signals normal",
-            })
+        columns = {
+            key: np.array([s[key] for s in projected], dtype=np.float64)
+            for key in _TRIGGER_SIGNALS
+        }
+        # (products, rules) boolean mask
+        triggered = np.column_stack([
+            predicate(columns) for _rule_id, _name, predicate, _build in COMPILED_RULES
+        ])
 
-        return recommendations
+        results = []
+        for s, flags in zip(projected, triggered.tolist()):
+            recommendations = [
+                build(s)
+                for (_rule_id, _name, _predicate, build), hit in zip(COMPILED_RULES, flags)
+                if hit
+            ]
+            results.append(recommendations or [dict(HOLD_RECOMMENDATION)])
+        return results
 
     def _build_decision_log(
-        self, signals: dict, recommendations: list[dict],
+        self, signals: dict, recommendations: list[dict], now: str,
     ) -> list[dict]:
-        """Build audit trail of rule evaluations."""
-        now = datetime.now(timezone.utc).strftime("%H:%M:%S")
+        """Build audit trail of rule evaluations, stamped with `now` (HH:MM:SS)."""
+        # Each rule adds at most one recommendation
+        rec_by_rule = {r["rule"]: r for r in recommendations if "rule" in r}
+        inputs = _log_inputs(signals)
         log = []
 
         for rule in RULES:
-            triggered = any(
-                r.get("rule") == rule["name"] for r in recommendations
-            )
+            rec = rec_by_rule.get(rule["name"])
             log.append({
                 "time": now,
                 "rule": rule["name"],
-                "input": self._get_rule_input(signals, rule["id"]),
-                "decision": (
-                    next(
-                        (f"ACTION: {r['title']}" for r in recommendations if r.get("rule") == rule["name"]),
-                        "PASS: within threshold",
-                    )
-                ),
-                "confidence": (
-                    next(
-                        (r["confidence"] for r in recommendations if r.get("rule") == rule["name"]),
-                        95,
-                    )
-                ),
+                "input": self._get_rule_input(inputs, rule["id"]),
+                "decision": f"ACTION: {rec['title']}" if rec else "PASS: within threshold",
+                "confidence": rec["confidence"] if rec else 95,
             })
 
         return log
 
-    def _get_rule_input(self, signals: dict, rule_id: int) -> str:
-        """Format relevant signal values for a rule."""
-        inputs = {
-            1: f"position={signals.get('price_position_index', 0):.2f}",
-            2: f"growth={signals.get('demand_growth_rate', 0):.2f}, momentum={signals.get('trend_momentum', 0):.0f}",
-            3: f"growth={signals.get('demand_growth_rate', 0):.2f}",
-            4: f"seasonal={signals.get('seasonal_index', 0):.2f}",
-            5: f"momentum={signals.get('trend_momentum', 0):.0f}, growth={signals.get('demand_growth_rate', 0):.2f}",
-            6: f"position={signals.get('price_position_index', 0):.2f}",
-        }
-        return inputs.get(rule_id, "N/A")
+    def _get_rule_input(self, inputs: dict, rule_id: int) -> str:
+        """Format relevant signal values (from _log_inputs) for a rule."""
+        fmt = RULE_INPUT_FORMATS.get(rule_id)
+        return fmt.format(**inputs) if fmt else "N/A"
 
     async def evaluate(self, product_id: str) -> dict:
         """
@@ -298,16 +374,17 @@ class DecisionEngine:
         """
         # Get product price
         try:
-            product = (
+            # The sync client blocks, so the query runs off the event loop
+            query = (
                 supabase.table("products")
                 .select("id, name, base_price")
                 .eq("id", product_id)
-                .limit(1)
-                .execute()
+                .maybe_single()
             )
-            if product.data:
-                your_price = float(product.data[0]["base_price"])
-                product_name = product.data[0]["name"]
+            product = await asyncio.to_thread(query.execute)
+            if product and product.data:
+                your_price = float(product.data["base_price"])
+                product_name = product.data["name"]
             else:
                 your_price = 100.0
                 product_name = "Unknown"
@@ -318,16 +395,35 @@ class DecisionEngine:
         # Step 1: Compute signals
         signals = await self.engineer.compute_signals(product_id, your_price)
 
+        return self._build_result(product_id, product_name, signals)
+
+    def _build_result(
+        self,
+        product_id: str,
+        product_name: str,
+        signals: dict,
+        recommendations: Optional[list[dict]] = None,
+    ) -> dict:
+        """
+        Run rule evaluation and the audit log over computed signals.
+        Pass `recommendations` when the rules were already evaluated.
+        """
+        # One clock read for both the log entries and evaluated_at
+        evaluated_at = datetime.now(timezone.utc)
+
         # Step 2 & 3: Evaluate rules → recommendations
-        recommendations = self._evaluate_rules(signals)
+        if recommendations is None:
+            recommendations = self._evaluate_rules(signals)
 
         # Step 4: Build decision log
-        decision_log = self._build_decision_log(signals, recommendations)
+        decision_log = self._build_decision_log(
+            signals, recommendations, evaluated_at.strftime("%H:%M:%S"),
+        )
 
         result = {
             "product_id": product_id,
             "product_name": product_name,
-            "evaluated_at": datetime.now(timezone.utc).isoformat(),
+            "evaluated_at": evaluated_at.isoformat(),
             "signals": signals,
             "recommendations": recommendations,
             "decision_log": decision_log,
@@ -342,19 +438,59 @@ class DecisionEngine:
         )
         return result
 
+    async def evaluate_many(self, product_ids: list[str]) -> list[dict]:
+        """
+        Run decision engine evaluation for several products, fetching
+        product rows and signal inputs with one query per table.
+
+        Returns:
+            list of evaluation dicts, in the same order as product_ids.
+        """
+        if not product_ids:
+            return []
+
+        try:
+            query = (
+                supabase.table("products")
+                .select("id, name, base_price")
+                .in_("id", product_ids)
+            )
+            response = await asyncio.to_thread(query.execute)
+            by_id = {p["id"]: p for p in response.data or []}
+        except Exception as e:
+            logger.error(f"Failed to fetch products: {e}")
+            by_id = {}
+
+        products = [
+            by_id.get(pid, {"id": pid, "name": "Unknown", "base_price": 100.0})
+            for pid in product_ids
+        ]
+        return await self._evaluate_products(products)
+
+    async def _evaluate_products(self, products: list[dict]) -> list[dict]:
+        """Evaluate already-fetched product rows (id, name, base_price)."""
+        all_signals = await self.engineer.compute_signals_many(products)
+        all_recommendations = self._evaluate_rules_many(all_signals)
+
+        return [
+            self._build_result(p["id"], p["name"], signals, recommendations)
+            for p, signals, recommendations in zip(products, all_signals, all_recommendations)
+        ]
+
     async def evaluate_all_products(self) -> list[dict]:
-        """Run decision engine for all products."""
+        """
+        Run decision engine for all products, with one query for the
+        product rows and one per signal table for their inputs.
+        """
         try:
-            response = supabase.table("products").select("id").execute()
+            query = supabase.table("products").select("id, name, base_price")
+            response = await asyncio.to_thread(query.execute)
             products = response.data or []
         except Exception as e:
             logger.error(f"Failed to fetch products: {e}")
             return []
 
-        results = []
-        for p in products:
-            result = await self.evaluate(p["id"])
-            results.append(result)
+        results = await self._evaluate_products(products)
 
         logger.info(f"✓ Evaluated {len(results)} products")
         return results
@@ -26,11 +26,15 @@ Usage:
     signals = await engineer.compute_signals(product_id, your_price)
 """
 
-import math
+import asyncio
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Optional
 
+import numpy as np
+
+from core.cache import TTLCache
 from db.supabase_client import supabase
 
 # ── Logging ──────────────────────────────────────────────────────────
@@ -45,21 +49,44 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# Per-product feature groups for compute_signals.  Keys carry the
+# inputs besides stored history (your_price, the date window), and
+# failed fetches are not cached
+_pricing_signals = TTLCache(maxsize=1024, ttl=300)
+_demand_signals = TTLCache(maxsize=1024, ttl=300)
+_trend_signals = TTLCache(maxsize=1024, ttl=300)
+_elasticity_signals = TTLCache(maxsize=1024, ttl=300)
+
+# Sales columns, read by both the demand and elasticity groups, so a
+# compute_signals call fetches them once
+_sales_arrays = TTLCache(maxsize=1024, ttl=300)
+
+# Column dtypes for _rows_to_arrays
+_SALES_SCHEMA = {"units_sold": np.int64, "sale_date": "datetime64[D]"}
+_PRICE_SCHEMA = {"price": np.float64}
+_TREND_SCHEMA = {"trend_score": np.float64}
+
 
 # ── Helper Functions ─────────────────────────────────────────────────
 
-def _safe_mean(values: list[float]) -> float:
-    """Mean with zero-division guard."""
-    return sum(values) / len(values) if values else 0.0
+def _safe_mean(values) -> float:
+    """Mean with zero-division guard (lists or NumPy arrays)."""
+    arr = np.asarray(values, dtype=np.float64)
+    return float(arr.mean()) if arr.size else 0.0
 
 
-def _safe_std(values: list[float]) -> float:
-    """Population standard deviation with guard."""
-    if len(values) < 2:
-        return 0.0
-    mean = _safe_mean(values)
-    variance = sum((x - mean) ** 2 for x in values) / len(values)
-    return math.sqrt(variance)
+def _safe_mean_std(values) -> tuple[float, float]:
+    """
+    Mean and population standard deviation sharing one mean pass;
+    the std is computed the way ndarray.std() does, from that mean.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    if not arr.size:
+        return 0.0, 0.0
+    mean = arr.mean()
+    if arr.size < 2:
+        return float(mean), 0.0
+    return float(mean), float(np.sqrt(np.square(arr - mean).mean()))
 
 
 def _classify_level(value: float, low: float, high: float) -> str:
@@ -71,6 +98,25 @@ def _classify_level(value: float, low: float, high: float) -> str:
     return "high"
 
 
+_LEVELS = np.array(["low", "medium", "high"])
+
+
+def _classify_levels(values, low: float, high: float) -> list[str]:
+    """_classify_level over a whole array at once (no per-value branching)."""
+    return _LEVELS[np.searchsorted([low, high], values, side="left")].tolist()
+
+
+def _rows_to_arrays(rows: list[dict], schema: dict) -> dict[str, np.ndarray]:
+    """
+    One typed array per schema column, so fetched fields are parsed once
+    here rather than by every feature that reads them.
+    """
+    return {
+        column: np.fromiter((r[column] for r in rows), dtype=dtype, count=len(rows))
+        for column, dtype in schema.items()
+    }
+
+
 # ── Feature Engineer ─────────────────────────────────────────────────
 
 class FeatureEngineer:
@@ -79,6 +125,29 @@ class FeatureEngineer:
     for a given product.
     """
 
+    # ── Shared Row Fetches ───────────────────────────────────────
+
+    async def _fetch_sales(self, product_id: str) -> dict[str, np.ndarray]:
+        """
+        sales_data rows of the last 90 days as units_sold / sale_date
+        arrays (oldest first), shared by the demand and elasticity
+        signals: the oldest 200 rows of the window plus the newest 60 of
+        the last 30 days, the most either signal reads.
+        Callers must not mutate them.
+        """
+        cutoff = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
+        recent_cutoff = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
+
+        async def load() -> dict[str, np.ndarray]:
+            query = supabase.rpc("sales_window", {
+                "pids": [product_id], "since": cutoff, "head": 200,
+                "recent_since": recent_cutoff, "tail": 60,
+            })
+            response = await asyncio.to_thread(query.execute)
+            return _rows_to_arrays(response.data or [], _SALES_SCHEMA)
+
+        return await _sales_arrays.get_or_load((product_id, cutoff, recent_cutoff), load)
+
     # ── A. Pricing Intelligence ──────────────────────────────────
 
     async def _pricing_features(
@@ -88,21 +157,38 @@ class FeatureEngineer:
         Compute competitor price average, variance, position index,
         and volatility from competitor_prices table.
         """
-        try:
-            response = (
-                supabase.table("competitor_prices")
-                .select("price, recorded_at")
-                .eq("product_id", product_id)
-                .order("recorded_at", desc=True)
-                .limit(200)
-                .execute()
+        async def load() -> dict:
+            # Mean and variance of the latest 200 prices, aggregated in
+            # the database so only one row comes back
+            query = supabase.rpc("competitor_price_stats", {"pid": product_id, "n": 200})
+            rows = (await asyncio.to_thread(query.execute)).data or []
+            stats = rows[0] if rows else {}
+            if not stats.get("n_prices"):
+                return self._pricing_from_stats(0, 0.0, 0.0, your_price)
+            std = float(np.sqrt(max(float(stats["var_price"]), 0.0)))
+            return self._pricing_from_stats(
+                stats["n_prices"], float(stats["avg_price"]), std, your_price,
             )
-            rows = response.data or []
+
+        try:
+            return await _pricing_signals.get_or_load((product_id, your_price), load)
         except Exception as e:
             logger.warning(f"Failed to fetch competitor prices: {e}")
-            rows = []
+            return self._pricing_from_stats(0, 0.0, 0.0, your_price)
 
-        if not rows:
+    def _pricing_from_stats(
+        self,
+        count: int,
+        avg: float,
+        std: float,
+        your_price: float,
+        volatility: Optional[str] = None,
+    ) -> dict:
+        """
+        Pricing signals from the count, mean and std of competitor prices.
+        Pass `volatility` when the label was already classified in bulk.
+        """
+        if not count:
             return {
                 "competitor_price_avg": 0.0,
                 "price_variance": 0.0,
@@ -111,10 +197,6 @@ class FeatureEngineer:
                 "price_volatility_score": 0.0,
             }
 
-        prices = [float(r["price"]) for r in rows]
-        avg = _safe_mean(prices)
-        std = _safe_std(prices)
-
         position = round(your_price / avg, 4) if avg > 0 else 1.0
         cv = (std / avg) if avg > 0 else 0.0  # coefficient of variation
 
@@ -122,7 +204,7 @@ class FeatureEngineer:
             "competitor_price_avg": round(avg, 2),
             "price_variance": round(std, 2),
             "price_position_index": position,
-            "price_volatility": _classify_level(cv, 0.05, 0.15),
+            "price_volatility": volatility or _classify_level(cv, 0.05, 0.15),
             "price_volatility_score": round(cv, 4),
         }
 
@@ -133,23 +215,28 @@ class FeatureEngineer:
         Compute moving average demand, growth rate, and seasonal
         index from sales_data table.
         """
-        try:
-            cutoff = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
-            response = (
-                supabase.table("sales_data")
-                .select("units_sold, sale_date")
-                .eq("product_id", product_id)
-                .gte("sale_date", cutoff)
-                .order("sale_date", desc=True)
-                .limit(60)
-                .execute()
+        cutoff = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
+
+        async def load() -> dict:
+            # Newest 60 rows of the last 30 days, from the shared 90-day fetch
+            sales = await self._fetch_sales(product_id)
+            recent = sales["sale_date"] >= np.datetime64(cutoff)
+            return self._demand_from_arrays(
+                sales["units_sold"][recent][-60:], sales["sale_date"][recent][-60:],
             )
-            rows = response.data or []
+
+        try:
+            return await _demand_signals.get_or_load((product_id, cutoff), load)
         except Exception as e:
             logger.warning(f"Failed to fetch sales data: {e}")
-            rows = []
+            return self._demand_from_arrays(np.empty(0, np.int64), np.empty(0, "datetime64[D]"))
 
-        if not rows:
+    def _demand_from_arrays(self, units: np.ndarray, days: np.ndarray) -> dict:
+        """
+        Demand signals from the last 30 days of units sold and their
+        sale dates (oldest first).
+        """
+        if not units.size:
             return {
                 "moving_avg_demand": 0.0,
                 "demand_growth_rate": 0.0,
@@ -157,13 +244,12 @@ class FeatureEngineer:
                 "seasonal_index": 1.0,
             }
 
-        # Sort oldest → newest
-        rows.sort(key=lambda r: r["sale_date"])
-        units = [int(r["units_sold"]) for r in rows]
-
         # 7-day moving average (last 7 entries)
-        last_7 = units[-7:] if len(units) >= 7 else units
-        prev_7 = units[-14:-7] if len(units) >= 14 else units[:len(units) // 2] or [0]
+        last_7 = units[-7:]
+        if len(units) >= 14:
+            prev_7 = units[-14:-7]
+        else:
+            prev_7 = units[:len(units) // 2] if len(units) >= 2 else [0]
 
         ma = _safe_mean(last_7)
         prev_ma = _safe_mean(prev_7)
@@ -174,21 +260,13 @@ class FeatureEngineer:
         else:
             growth = 0.0
 
-        # Seasonal index: weekend vs weekday ratio
-        weekend_sales, weekday_sales = [], []
-        for r in rows:
-            try:
-                d = datetime.strptime(r["sale_date"], "%Y-%m-%d")
-                u = int(r["units_sold"])
-                if d.weekday() >= 5:
-                    weekend_sales.append(u)
-                else:
-                    weekday_sales.append(u)
-            except (ValueError, KeyError):
-                continue
-
-        wd_avg = _safe_mean(weekday_sales) if weekday_sales else 1.0
-        we_avg = _safe_mean(weekend_sales) if weekend_sales else wd_avg
+        # Seasonal index: weekend vs weekday ratio; 1970-01-01 was a
+        # Thursday (weekday 3)
+        is_weekend = (days.view(np.int64) + 3) % 7 >= 5
+        weekend_sales, weekday_sales = units[is_weekend], units[~is_weekend]
+
+        wd_avg = _safe_mean(weekday_sales) if weekday_sales.size else 1.0
+        we_avg = _safe_mean(weekend_sales) if weekend_sales.size else wd_avg
         seasonal = round(we_avg / wd_avg, 4) if wd_avg > 0 else 1.0
 
         growth_label = "rising" if growth > 0.05 else ("falling" if growth < -0.05 else "stable")
@@ -207,44 +285,42 @@ class FeatureEngineer:
         Compute trend momentum and acceleration from trend_metrics
         table.
         """
-        try:
-            response = (
+        async def load() -> dict:
+            query = (
                 supabase.table("trend_metrics")
-                .select("trend_score, recorded_at")
+                .select("trend_score")
                 .eq("product_id", product_id)
                 .order("recorded_at", desc=True)
                 .limit(20)
-                .execute()
             )
-            rows = response.data or []
+            response = await asyncio.to_thread(query.execute)
+            scores = _rows_to_arrays(response.data or [], _TREND_SCHEMA)["trend_score"]
+            return self._trend_from_scores(scores[::-1])
+
+        try:
+            return await _trend_signals.get_or_load(product_id, load)
         except Exception as e:
             logger.warning(f"Failed to fetch trend metrics: {e}")
-            rows = []
+            return self._trend_from_scores(np.empty(0))
 
-        if len(rows) < 2:
+    def _trend_from_scores(self, scores: np.ndarray) -> dict:
+        """Trend signals from trend_metrics scores (oldest first)."""
+        if len(scores) < 2:
             return {
                 "trend_momentum": 0.0,
                 "trend_momentum_label": "stable",
                 "trend_acceleration": 0.0,
             }
 
-        # Oldest → newest
-        rows.reverse()
-        scores = [float(r["trend_score"]) for r in rows]
-
         # Momentum: change between first half avg and second half avg
         mid = len(scores) // 2
-        early = _safe_mean(scores[:mid])
-        late = _safe_mean(scores[mid:])
-        momentum = late - early
+        momentum = float(scores[mid:].mean() - scores[:mid].mean())
 
         # Acceleration: difference of consecutive deltas
         if len(scores) >= 3:
-            deltas = [scores[i + 1] - scores[i] for i in range(len(scores) - 1)]
+            deltas = np.diff(scores)
             mid_d = len(deltas) // 2
-            early_d = _safe_mean(deltas[:mid_d]) if mid_d > 0 else 0
-            late_d = _safe_mean(deltas[mid_d:])
-            acceleration = late_d - early_d
+            acceleration = float(deltas[mid_d:].mean() - deltas[:mid_d].mean())
         else:
             acceleration = 0.0
 
@@ -263,65 +339,71 @@ class FeatureEngineer:
         Quick elasticity estimate: correlate price changes with
         demand changes from recent data.
         """
-        try:
-            cutoff = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
-
-            sales_resp = (
-                supabase.table("sales_data")
-                .select("units_sold, sale_date")
-                .eq("product_id", product_id)
-                .gte("sale_date", cutoff)
-                .order("sale_date", desc=False)
-                .limit(200)
-                .execute()
-            )
-            sales = sales_resp.data or []
+        cutoff = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
 
-            price_resp = (
+        async def load() -> dict:
+            query = (
                 supabase.table("competitor_prices")
-                .select("price, recorded_at")
+                .select("price")
                 .eq("product_id", product_id)
                 .order("recorded_at", desc=True)
                 .limit(50)
-                .execute()
             )
-            prices = price_resp.data or []
+            sales, response = await asyncio.gather(
+                self._fetch_sales(product_id),
+                asyncio.to_thread(query.execute),
+            )
+            prices = _rows_to_arrays(response.data or [], _PRICE_SCHEMA)["price"]
+            return self._elasticity_from_arrays(sales["units_sold"][:200], prices)
+
+        try:
+            return await _elasticity_signals.get_or_load((product_id, cutoff), load)
         except Exception as e:
             logger.warning(f"Failed to fetch elasticity data: {e}")
             return {"elasticity_estimate": 0.0, "elasticity_label": "unknown"}
 
-        if len(sales) < 4 or len(prices) < 2:
+    def _elasticity_from_arrays(self, units: np.ndarray, prices: np.ndarray) -> dict:
+        """
+        Elasticity signal from units sold (oldest first) and competitor
+        prices (newest first).
+        """
+        elasticity = self._elasticity_estimate(units, prices)
+        if elasticity is None:
             return {"elasticity_estimate": 0.0, "elasticity_label": "unknown"}
 
+        return {
+            "elasticity_estimate": elasticity,
+            "elasticity_label": _classify_level(abs(elasticity), 0.3, 0.6),
+        }
+
+    def _elasticity_estimate(
+        self, units: np.ndarray, prices: np.ndarray,
+    ) -> Optional[float]:
+        """Price-demand correlation, or None when there is too little data."""
+        if len(units) < 4 or len(prices) < 2:
+            return None
+
         # Simple correlation: does higher average competitor price
         # correspond to lower demand?
-        price_vals = [float(p["price"]) for p in prices]
-        demand_vals = [int(s["units_sold"]) for s in sales]
+        price_vals = prices
+        demand_vals = units.astype(np.float64)
 
         # Normalize both to z-scores and compute correlation
-        p_mean = _safe_mean(price_vals)
-        p_std = _safe_std(price_vals)
-        d_mean = _safe_mean(demand_vals)
-        d_std = _safe_std(demand_vals)
+        p_mean, p_std = _safe_mean_std(price_vals)
+        d_mean, d_std = _safe_mean_std(demand_vals)
 
         if p_std == 0 or d_std == 0:
-            return {"elasticity_estimate": 0.0, "elasticity_label": "low"}
+            return 0.0
 
-        # Use the shorter of the two for correlation
+        # Use the shorter of the two for correlation; z-scores use the
+        # full-series mean and std, so this is not np.corrcoef
         n = min(len(price_vals), len(demand_vals))
-        correlation = sum(
-            ((price_vals[i] - p_mean) / p_std) * ((demand_vals[i] - d_mean) / d_std)
-            for i in range(n)
+        correlation = float(
+            ((price_vals[:n] - p_mean) / p_std) @ ((demand_vals[:n] - d_mean) / d_std)
         ) / n
 
         # Negative correlation means elastic (price up → demand down)
-        elasticity = round(correlation, 4)
-        label = _classify_level(abs(elasticity), 0.3, 0.6)
-
-        return {
-            "elasticity_estimate": elasticity,
-            "elasticity_label": label,
-        }
+        return round(correlation, 4)
 
     # ── Main Entry Point ─────────────────────────────────────────
 
@@ -342,11 +424,28 @@ class FeatureEngineer:
         """
         logger.info(f"Computing signals for product {product_id}...")
 
-        pricing = await self._pricing_features(product_id, your_price)
-        demand = await self._demand_features(product_id)
-        trends = await self._trend_features(product_id)
-        elasticity = await self._elasticity_signal(product_id)
+        # The four feature groups read independent tables
+        pricing, demand, trends, elasticity = await asyncio.gather(
+            self._pricing_features(product_id, your_price),
+            self._demand_features(product_id),
+            self._trend_features(product_id),
+            self._elasticity_signal(product_id),
+        )
+
+        return self._assemble_signals(
+            product_id, your_price, pricing, demand, trends, elasticity,
+        )
 
+    def _assemble_signals(
+        self,
+        product_id: str,
+        your_price: float,
+        pricing: dict,
+        demand: dict,
+        trends: dict,
+        elasticity: dict,
+    ) -> dict:
+        """Merge the four feature groups into one signals dict."""
         signals = {
             "product_id": product_id,
             "your_price": your_price,
@@ -367,29 +466,130 @@ class FeatureEngineer:
 
         return signals
 
+    async def compute_signals_many(self, products: list[dict]) -> list[dict]:
+        """
+        Compute signals for several products with one query per table
+        instead of one set of queries per product.
+
+        Args:
+            products: list of dicts with 'id' and 'base_price'.
+
+        Returns:
+            list of signal dicts, in the same order as products.
+        """
+        if not products:
+            return []
+
+        ids = [p["id"] for p in products]
+        demand_cutoff = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
+        sales_cutoff = (datetime.utcnow() - timedelta(days=90)).strftime("%Y-%m-%d")
+
+        # Only the rows of each product that the signals use, picked per
+        # product in the database
+        queries = {
+            "competitor_prices": supabase.rpc(
+                "latest_competitor_prices", {"pids": ids, "n": 200},
+            ),
+            "sales_data": supabase.rpc("sales_window", {
+                "pids": ids, "since": sales_cutoff, "head": 200,
+                "recent_since": demand_cutoff, "tail": 60,
+            }),
+            "trend_metrics": supabase.rpc(
+                "latest_trend_scores", {"pids": ids, "n": 20},
+            ),
+        }
+        responses = await asyncio.gather(
+            *(asyncio.to_thread(q.execute) for q in queries.values()),
+            return_exceptions=True,
+        )
+
+        # Bucket every table's rows by product, preserving query order
+        grouped = {}
+        for table, response in zip(queries, responses):
+            by_product = defaultdict(list)
+            if isinstance(response, Exception):
+                logger.warning(f"Failed to fetch {table}: {response}")
+            else:
+                for row in response.data or []:
+                    by_product[row["product_id"]].append(row)
+            grouped[table] = by_product
+
+        schemas = {
+            "competitor_prices": _PRICE_SCHEMA,
+            "sales_data": _SALES_SCHEMA,
+            "trend_metrics": _TREND_SCHEMA,
+        }
+        columns = [
+            {
+                table: _rows_to_arrays(grouped[table].get(p["id"], []), schema)
+                for table, schema in schemas.items()
+            }
+            for p in products
+        ]
+
+        # Classify volatility and elasticity for every product in one
+        # vectorized pass each
+        stats = []
+        for c in columns:
+            prices = c["competitor_prices"]["price"][:200]
+            stats.append((prices.size, *_safe_mean_std(prices)))
+        avgs = np.array([avg for _, avg, _ in stats])
+        stds = np.array([std for _, _, std in stats])
+        cvs = np.divide(stds, avgs, out=np.zeros_like(avgs), where=avgs > 0)
+        volatilities = _classify_levels(cvs, 0.05, 0.15)
+
+        estimates = [
+            self._elasticity_estimate(
+                c["sales_data"]["units_sold"][:200], c["competitor_prices"]["price"][:50],
+            )
+            for c in columns
+        ]
+        elasticity_labels = _classify_levels(
+            np.abs([e or 0.0 for e in estimates]), 0.3, 0.6,
+        )
+
+        results = []
+        for i, p in enumerate(products):
+            your_price = float(p["base_price"])
+            sales = columns[i]["sales_data"]
+            recent = sales["sale_date"] >= np.datetime64(demand_cutoff)
+            if estimates[i] is None:
+                elasticity = {"elasticity_estimate": 0.0, "elasticity_label": "unknown"}
+            else:
+                elasticity = {
+                    "elasticity_estimate": estimates[i],
+                    "elasticity_label": elasticity_labels[i],
+                }
+
+            results.append(self._assemble_signals(
+                p["id"],
+                your_price,
+                self._pricing_from_stats(*stats[i], your_price, volatilities[i]),
+                self._demand_from_arrays(
+                    sales["units_sold"][recent][-60:], sales["sale_date"][recent][-60:],
+                ),
+                self._trend_from_scores(columns[i]["trend_metrics"]["trend_score"][:20][::-1]),
+                elasticity,
+            ))
+
+        return results
+
     async def compute_all_products(self) -> list[dict]:
         """
-        Compute signals for every product in the products table.
+        Compute signals for every product in the products table, with
+        one query per signal table for all products together.
         """
         try:
-            response = (
-                supabase.table("products")
-                .select("id, name, base_price")
-                .execute()
-            )
+            query = supabase.table("products").select("id, name, base_price")
+            response = await asyncio.to_thread(query.execute)
             products = response.data or []
         except Exception as e:
             logger.error(f"Failed to fetch products: {e}")
             return []
 
-        results = []
-        for p in products:
-            signals = await self.compute_signals(
-                product_id=p["id"],
-                your_price=float(p["base_price"]),
-            )
+        results = await self.compute_signals_many(products)
+        for p, signals in zip(products, results):
             signals["product_name"] = p["name"]
-            results.append(signals)
 
         logger.info(f"✓ Computed signals for {len(results)} products")
         return results
@@ -398,8 +598,6 @@ class FeatureEngineer:
 # ── Standalone test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import asyncio
-
     async def _test():
         engineer = FeatureEngineer()
         results = await engineer.compute_all_products()
@@ -15,11 +15,15 @@ Usage:
 """
 
 import math
-import random
+import asyncio
 import logging
 from datetime import date, timedelta
 from typing import Optional
 
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+from db.constants import INSERT_BATCH_SIZE, INSERT_CONCURRENCY
 from db.supabase_client import supabase
 from db.schemas import SalesRecordCreate
 
@@ -35,6 +39,12 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# Validates a whole chunk of simulated rows in one pydantic-core pass
+_SALES_LIST = TypeAdapter(list[SalesRecordCreate])
+
+# Fields of a simulated sales row, in structured-array order
+_SALES_FIELDS = ("product_id", "units_sold", "sale_date")
+
 
 # ── Seasonality ──────────────────────────────────────────────────────
 
@@ -53,20 +63,28 @@ def get_season(d: date) -> str:
         return "winter"
 
 
+# Demand multiplier per season, simulating real-world buying patterns
+SEASON_MULTIPLIERS = {
+    "spring": 1.0,
+    "summer": 1.15,     # summer sales boost
+    "monsoon": 0.85,    # monsoon dip
+    "autumn": 1.05,     # pre-festival buying
+    "winter": 1.30,     # holiday/Diwali/Christmas peak
+}
+
+# Season multiplier by month, January first; the season only depends
+# on the month
+_MONTH_MULTIPLIERS = np.array(
+    [SEASON_MULTIPLIERS[get_season(date(2000, month, 1))] for month in range(1, 13)]
+)
+
+
 def seasonal_multiplier(d: date) -> float:
     """
     Return a demand multiplier based on season.
     Simulates real-world buying patterns.
     """
-    season = get_season(d)
-    multipliers = {
-        "spring": 1.0,
-        "summer": 1.15,     # summer sales boost
-        "monsoon": 0.85,    # monsoon dip
-        "autumn": 1.05,     # pre-festival buying
-        "winter": 1.30,     # holiday/Diwali/Christmas peak
-    }
-    return multipliers.get(season, 1.0)
+    return _MONTH_MULTIPLIERS.item(d.month - 1)
 
 
 # ── Simulator ────────────────────────────────────────────────────────
@@ -78,8 +96,9 @@ class SalesSimulator:
     """
 
     def __init__(self, seed: Optional[int] = 42):
-        if seed is not None:
-            random.seed(seed)
+        # Own generator, so a seeded run is reproducible without touching
+        # the global random module
+        self.rng = np.random.default_rng(seed)
         self.records: list[dict] = []
 
     def generate_sales(
@@ -109,57 +128,84 @@ class SalesSimulator:
         Returns:
             List of sales record dicts.
         """
+        units, day_numbers = self._simulate_units(
+            product_name, base_price, base_demand, days, end_date, growth_rate, elasticity,
+        )
+
+        # datetime64[D] formats as YYYY-MM-DD, the same as date.isoformat()
+        sale_dates = day_numbers.astype(str).tolist()
+        return [
+            {"product_id": product_id, "units_sold": units_sold, "sale_date": sale_date}
+            for units_sold, sale_date in zip(units.tolist(), sale_dates)
+        ]
+
+    def _simulate_units(
+        self,
+        product_name: str,
+        base_price: float,
+        base_demand: int,
+        days: int,
+        end_date: Optional[date],
+        growth_rate: float,
+        elasticity: float,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Simulate daily units sold for one product.
+
+        Returns:
+            (units_sold, sale_date) arrays, one entry per day, oldest first.
+        """
         if end_date is None:
             end_date = date.today()
 
         start_date = end_date - timedelta(days=days - 1)
-        records = []
 
-        for day_offset in range(days):
-            current_date = start_date + timedelta(days=day_offset)
+        # Seasonal multiplier and weekend flag for every day, looked up
+        # once from the month table; 1970-01-01 was a Thursday (weekday 3)
+        day_numbers = np.datetime64(start_date, "D") + np.arange(days)
+        months = day_numbers.astype("datetime64[M]").astype(np.int64) % 12
+        weekends = (day_numbers.astype(np.int64) + 3) % 7 >= 5
 
-            # 1. Base demand with growth trend
-            trend_factor = 1.0 + growth_rate * day_offset
-            demand = base_demand * trend_factor
+        # Every random draw for the run, in bulk
+        price_noise = self.rng.uniform(-0.08, 0.08, days)
+        demand_noise = self.rng.normal(1.0, 0.15, days)
+        spike_roll = self.rng.random(days)
+        spike_mag = self.rng.uniform(1.5, 3.0, days)
 
-            # 2. Seasonality
-            demand *= seasonal_multiplier(current_date)
+        # 1. Base demand with growth trend
+        demand = base_demand * (1.0 + growth_rate * np.arange(days))
 
-            # 3. Weekday effect (weekends = +20%)
-            if current_date.weekday() >= 5:
-                demand *= 1.20
+        # 2. Seasonality
+        demand *= _MONTH_MULTIPLIERS[months]
 
-            # 4. Random daily price variation (±8%)
-            daily_price = base_price * (1 + random.uniform(-0.08, 0.08))
+        # 3. Weekday effect (weekends = +20%)
+        demand *= np.where(weekends, 1.20, 1.0)
 
-            # 5. Price elasticity effect on demand
-            price_ratio = daily_price / base_price
-            elasticity_effect = price_ratio ** elasticity
-            demand *= elasticity_effect
+        # 4. Random daily price variation (±8%)
+        daily_price = base_price * (1 + price_noise)
 
-            # 6. Random noise (±15%)
-            noise = random.gauss(1.0, 0.15)
-            demand *= max(noise, 0.1)  # floor to prevent negatives
+        # 5. Price elasticity effect on demand
+        price_ratio = daily_price / base_price
+        demand *= price_ratio ** elasticity
 
-            # 7. Occasional spike days (flash sales, viral moments)
-            if random.random() < 0.02:  # 2% chance
-                demand *= random.uniform(1.5, 3.0)
-                logger.debug(f"Spike day: {current_date}")
+        # 6. Random noise (±15%)
+        demand *= np.maximum(demand_noise, 0.1)  # floor to prevent negatives
 
-            units_sold = max(1, int(round(demand)))
+        # 7. Occasional spike days (flash sales, viral moments)
+        spikes = spike_roll < 0.02  # 2% chance
+        demand *= np.where(spikes, spike_mag, 1.0)
+        if logger.isEnabledFor(logging.DEBUG):
+            for spike_day in day_numbers[spikes].astype(str).tolist():
+                logger.debug("Spike day: %s", spike_day)
 
-            record = {
-                "product_id": product_id,
-                "units_sold": units_sold,
-                "sale_date": current_date.isoformat(),
-            }
-            records.append(record)
+        # rint rounds half to even, like round()
+        units = np.maximum(1, np.rint(demand)).astype(np.int64)
 
         logger.info(
-            f"Generated {len(records)} days of sales for '{product_name}' "
-            f"(avg ~{sum(r['units_sold'] for r in records) // len(records)} units/day)"
+            f"Generated {len(units)} days of sales for '{product_name}' "
+            f"(avg ~{int(units.sum()) // len(units)} units/day)"
         )
-        return records
+        return units, day_numbers
 
     async def generate_and_store(
         self,
@@ -177,41 +223,76 @@ class SalesSimulator:
         Returns:
             dict with 'total_records', 'stored', 'products_processed'.
         """
-        all_records = []
-
-        for product in products:
-            records = self.generate_sales(
-                product_id=product["product_id"],
+        # Every product's rows in one preallocated structured array,
+        # turned into dicts only a chunk at a time for the insert payload
+        id_width = max((len(p["product_id"]) for p in products), default=1)
+        all_records = np.empty(len(products) * days, dtype=[
+            ("product_id", f"U{id_width}"),
+            ("units_sold", np.int32),
+            ("sale_date", "U10"),
+        ])
+
+        for i, product in enumerate(products):
+            units, day_numbers = self._simulate_units(
                 product_name=product.get("product_name", "Unknown"),
                 base_price=product.get("base_price", 100.0),
                 base_demand=product.get("base_demand", 50),
                 days=days,
+                end_date=None,
                 growth_rate=product.get("growth_rate", 0.0005),
                 elasticity=product.get("elasticity", -1.2),
             )
-            all_records.extend(records)
-
-        # Validate all records
-        valid_records = []
-        for r in all_records:
-            try:
-                validated = SalesRecordCreate(**r)
-                valid_records.append(validated.model_dump(mode="json"))
-            except Exception as e:
-                logger.warning(f"Validation failed: {e}")
-
-        # Batch insert into Supabase (in chunks of 500 to avoid payload limits)
-        stored_count = 0
-        chunk_size = 500
-        for i in range(0, len(valid_records), chunk_size):
-            chunk = valid_records[i:i + chunk_size]
+            block = all_records[i * days:(i + 1) * days]
+            block["product_id"] = product["product_id"]
+            block["units_sold"] = units
+            block["sale_date"] = day_numbers.astype("U10")
+
+        def chunk_rows(chunk: np.ndarray) -> list[dict]:
+            rows = [dict(zip(_SALES_FIELDS, record)) for record in chunk.tolist()]
+            # Validate the chunk in one pass. Simulated rows already hold
+            # the JSON form of every field, so they are inserted as built
             try:
-                response = supabase.table("sales_data").insert(chunk).execute()
-                count = len(response.data) if response.data else 0
-                stored_count += count
-                logger.info(f"✓ Stored chunk {i // chunk_size + 1}: {count} records")
-            except Exception as e:
-                logger.error(f"✗ Supabase insert failed for chunk {i // chunk_size + 1}: {e}")
+                _SALES_LIST.validate_python(rows)
+                return rows
+            except ValidationError:
+                # Re-validate row by row so one bad record doesn't drop the chunk
+                valid_rows = []
+                for r in rows:
+                    try:
+                        SalesRecordCreate.model_validate(r)
+                        valid_rows.append(r)
+                    except ValidationError as e:
+                        logger.warning(f"Validation failed: {e}")
+                return valid_rows
+
+        # Batch insert into Supabase in chunks of INSERT_BATCH_SIZE rows,
+        # posting up to INSERT_CONCURRENCY chunks at a time
+        chunk_size = INSERT_BATCH_SIZE
+        chunks = [
+            all_records[i:i + chunk_size]
+            for i in range(0, len(all_records), chunk_size)
+        ]
+        semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+        async def store_chunk(number: int, chunk: np.ndarray) -> int:
+            async with semaphore:
+                try:
+                    rows = chunk_rows(chunk)
+                    if not rows:
+                        return 0
+                    query = supabase.table("sales_data").insert(rows)
+                    response = await asyncio.to_thread(query.execute)
+                    count = len(response.data) if response.data else 0
+                    logger.info(f"✓ Stored chunk {number}: {count} records")
+                    return count
+                except Exception as e:
+                    logger.error(f"✗ Supabase insert failed for chunk {number}: {e}")
+                    return 0
+
+        counts = await asyncio.gather(
+            *(store_chunk(number, chunk) for number, chunk in enumerate(chunks, 1))
+        )
+        stored_count = sum(counts)
 
         summary = {
             "total_records": len(all_records),
@@ -229,8 +310,6 @@ class SalesSimulator:
 # ── Standalone test ──────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    import asyncio
-
     async def _test():
         sim = SalesSimulator(seed=42)
         demo_products = [
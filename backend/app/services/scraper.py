@@ -3,11 +3,13 @@ Competitor Price Scraper — Production-grade web scraper for extracting
 competitor product prices and storing them in Supabase.
 
 Features:
-    - Async HTTP with httpx + retry logic + exponential backoff
+    - Async HTTP with one pooled httpx client + retry logic + exponential backoff
     - User-Agent rotation to avoid detection
-    - BeautifulSoup price extraction with multi-strategy CSS selectors
+    - Streamed downloads that stop once a JSON-LD price has arrived
+    - Lexbor (selectolax) price extraction with multi-strategy CSS selectors
     - Price normalization (currency symbols, commas, ranges)
-    - Rate limiting with random delays (2–5s)
+    - Concurrent scraping, bounded overall and per host
+    - Per-host token-bucket rate limiting that honours Retry-After
     - Batch upsert to Supabase competitor_prices table
     - Structured error logging per domain
 
@@ -17,15 +19,33 @@ Usage:
 """
 
 import re
+import time
+import codecs
 import random
 import asyncio
 import logging
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import cached_property, lru_cache
 from typing import Optional
+from urllib.parse import urlparse
 
 import httpx
-from bs4 import BeautifulSoup
+from pydantic import TypeAdapter, ValidationError
+from selectolax.lexbor import LexborHTMLParser, SelectolaxError
 
+try:
+    import h2  # noqa: F401 — lets httpx negotiate HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import uvloop  # faster event loop for standalone runs
+except ImportError:
+    uvloop = None
+
+from db.constants import INSERT_BATCH_SIZE, INSERT_CONCURRENCY
 from db.supabase_client import supabase
 from db.schemas import CompetitorPriceCreate
 
@@ -43,6 +63,9 @@ if not logger.handlers:
 
 # ── Constants ────────────────────────────────────────────────────────
 
+# Validates a whole batch of scraped prices in one pydantic-core pass
+_PRICE_LIST = TypeAdapter(list[CompetitorPriceCreate])
+
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
@@ -50,6 +73,20 @@ USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
 ]
 
+# One ready-made header dict per User-Agent, picked at random per request.
+# httpx merges them into its own Headers object, so sharing them is safe
+_HEADER_POOL = tuple(
+    {
+        "User-Agent": ua,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Accept-Encoding": "gzip, deflate, br",
+        "Connection": "keep-alive",
+        "Cache-Control": "no-cache",
+    }
+    for ua in USER_AGENTS
+)
+
 # CSS selectors to try IN ORDER for price extraction
 PRICE_SELECTORS = [
     # Generic e-commerce patterns
@@ -65,19 +102,67 @@ PRICE_SELECTORS = [
     '[class*="price"]', '[id*="price"]',
 ]
 
+# Compiled once for normalize_price
+_CURRENCY_RE = re.compile(r'[₹$€£¥]')
+_PREFIX_RE = re.compile(r'(?i)^(rs\.?|inr|usd|eur)\s*')
+_RANGE_RE = re.compile(r'([\d,]+(?:\.\d+)?)\s*[-–—to]+\s*([\d,]+(?:\.\d+)?)')
+_PRICE_RE = re.compile(r'([\d,]+(?:\.\d{1,2})?)')
+
+# "price" key inside a JSON-LD block (schema.org Offer), checked before
+# the page is parsed at all
+_JSONLD_TYPE = b"application/ld+json"
+_JSONLD_PRICE_RE = re.compile(rb'"price"\s*:\s*"?([\d,]+\.?\d*)')
+
+# Raw-HTML price patterns for the regex fallback, tried in order against
+# the lowercased page.  Case-sensitive patterns that open with a literal
+# get sre's fast prefix search; re.IGNORECASE, or a leading quote class,
+# steps through every character of a multi-megabyte page instead
+_JSON_PRICE_RE = re.compile(r'price["\']?\s*[:=]\s*["\']?\s*([\d,]+\.?\d*)')
+_RAW_PRICE_RES = [
+    re.compile(pattern)
+    for pattern in (
+        r'₹\s*([\d,]+\.?\d*)',
+        r'rs\.?\s*([\d,]+\.?\d*)',
+        r'\$\s*([\d,]+\.?\d*)',
+    )
+]
+
 MAX_RETRIES = 3
 BASE_TIMEOUT = 10.0       # seconds
-MIN_DELAY = 2.0           # seconds between requests
-MAX_DELAY = 5.0           # seconds between requests
+HOST_RATE = 1             # requests started per HOST_RATE_PERIOD on one host
+HOST_RATE_PERIOD = 3.0    # seconds
+MAX_RETRY_AFTER = 60.0    # longest Retry-After pause honoured, seconds
+MAX_CONNECTIONS = 64      # pooled connections shared by all fetches
+MAX_CONCURRENT_SCRAPES = 64   # targets scraped at once, across all hosts
+PER_HOST_CONCURRENCY = 8      # targets scraped at once on one host
+
+
+# ── Selector Validation ──────────────────────────────────────────────
+
+def _lexbor_accepts(selector: str) -> bool:
+    """True if Lexbor can compile the CSS selector."""
+    try:
+        LexborHTMLParser("<html></html>").css(selector)
+        return True
+    except SelectolaxError as e:
+        logger.warning(f"Skipping invalid price selector {selector!r}: {e}")
+        return False
+
+
+# PRICE_SELECTORS checked once at import, so extraction needs no
+# per-page try/except around each selector
+_SAFE_PRICE_SELECTORS = [s for s in PRICE_SELECTORS if _lexbor_accepts(s)]
 
 
 # ── Price Normalization ──────────────────────────────────────────────
 
+@lru_cache(maxsize=4096)
 def normalize_price(raw: str) -> Optional[float]:
     """
     Extract a numeric price from raw text.
     Handles: ₹1,234.56, $99.99, Rs. 1234, 1,000–2,000 (averages range), etc.
-    Returns None if no valid price found.
+    Returns None if no valid price found.  Pure, so results are memoized:
+    pages repeat the same price string in attributes, text and JSON.
     """
     if not raw or not raw.strip():
         return None
@@ -85,21 +170,23 @@ def normalize_price(raw: str) -> Optional[float]:
     text = raw.strip()
 
     # Strip known currency symbols and prefixes
-    text = re.sub(r'[₹$€£¥]', '', text)
-    text = re.sub(r'(?i)^(rs\.?|inr|usd|eur)\s*', '', text)
+    text = _CURRENCY_RE.sub('', text)
+    text = _PREFIX_RE.sub('', text)
     text = text.strip()
 
-    # Handle price ranges (e.g., "1,000 - 2,000" → average)
-    range_match = re.match(
-        r'([\d,]+(?:\.\d+)?)\s*[-–—to]+\s*([\d,]+(?:\.\d+)?)', text
-    )
+    # Handle price ranges (e.g., "1,000 - 2,000" → average); a side that
+    # is only commas is no number, so fall through to a single price
+    range_match = _RANGE_RE.match(text)
     if range_match:
-        low = float(range_match.group(1).replace(',', ''))
-        high = float(range_match.group(2).replace(',', ''))
-        return round((low + high) / 2, 2)
+        try:
+            low = float(range_match.group(1).replace(',', ''))
+            high = float(range_match.group(2).replace(',', ''))
+            return round((low + high) / 2, 2)
+        except ValueError:
+            pass
 
     # Standard single price
-    price_match = re.search(r'([\d,]+(?:\.\d{1,2})?)', text)
+    price_match = _PRICE_RE.search(text)
     if price_match:
         cleaned = price_match.group(1).replace(',', '')
         try:
@@ -112,6 +199,125 @@ def normalize_price(raw: str) -> Optional[float]:
     return None
 
 
+def _jsonld_scan(html: bytes, start: int = 0) -> tuple[Optional[str], int]:
+    """
+    Scan the JSON-LD script blocks from `start` for a "price" key.
+
+    Returns (raw price, end of its block) for the first block that has
+    one, else (None, offset) where offset is where a scan of a longer
+    prefix of the same page should resume — the first unclosed block.
+    """
+    pos = html.find(_JSONLD_TYPE, start)
+    while pos != -1:
+        body_start = html.find(b">", pos) + 1
+        body_end = html.find(b"</script", body_start) if body_start else -1
+        if body_end == -1:
+            return None, pos
+        match = _JSONLD_PRICE_RE.search(html, body_start, body_end)
+        if match:
+            return match.group(1).decode("ascii"), body_end
+        pos = html.find(_JSONLD_TYPE, body_end)
+    # The type attribute may be cut off at the end of the prefix
+    return None, max(start, len(html) - len(_JSONLD_TYPE) + 1)
+
+
+def _jsonld_price_text(html: bytes) -> Optional[str]:
+    """Raw "price" value from the first JSON-LD script block that has one."""
+    return _jsonld_scan(html)[0]
+
+
+def _raw_price_candidates(page: "ParsedPage"):
+    """Yield (pattern, text) for the first match of each raw-HTML price pattern, in order."""
+    low = page.lower
+
+    # A quoted "price" key: the quote, and any whitespace after it, come
+    # before the literal so they are checked by hand
+    for match in _JSON_PRICE_RE.finditer(low):
+        i = match.start()
+        while i and low[i - 1].isspace():
+            i -= 1
+        if i and low[i - 1] in "\"'":
+            yield _JSON_PRICE_RE.pattern, match.group(1)
+            break
+
+    for pattern in _RAW_PRICE_RES:
+        match = pattern.search(low)
+        if match:
+            yield pattern.pattern, match.group(1)
+
+
+class ParsedPage:
+    """
+    A fetched page, as UTF-8 bytes, shared by every price-extraction
+    strategy.  The Lexbor tree and the decoded, lowercased text are each
+    built on first use, at most once; Lexbor reads the bytes directly.
+    """
+
+    def __init__(self, raw: bytes):
+        self.raw = raw
+
+    @cached_property
+    def tree(self) -> LexborHTMLParser:
+        return LexborHTMLParser(self.raw)
+
+    @cached_property
+    def lower(self) -> str:
+        return self.raw.decode("utf-8", "replace").lower()
+
+
+# ── Rate Limiting ────────────────────────────────────────────────────
+
+class HostRateLimiter:
+    """
+    Token bucket for one host: at most `rate` requests start per `period`
+    seconds, and callers wait their turn in arrival order.  pause() holds
+    every request back, e.g. for a server's Retry-After.
+    """
+
+    def __init__(self, rate: int, period: float):
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        # The lock is held while waiting, so waiters are served in order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                refill = (now - self._updated) * self.rate / self.period
+                self._tokens = min(float(self.rate), self._tokens + refill)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+
+
+def _retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Seconds requested by a Retry-After header (delay or HTTP date), if any."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
 # ── Scraper Class ────────────────────────────────────────────────────
 
 class CompetitorScraper:
@@ -123,31 +329,60 @@ class CompetitorScraper:
     def __init__(self):
         self.results: list[dict] = []
         self.errors: list[dict] = []
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiters: dict[str, HostRateLimiter] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Return the shared HTTP client, creating it on first use, so every
+        fetch reuses pooled keep-alive connections.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                follow_redirects=True,
+                timeout=httpx.Timeout(BASE_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS,
+                    max_keepalive_connections=MAX_CONNECTIONS,
+                ),
+                verify=True,
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client and its pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _host_limiter(self, url: str) -> HostRateLimiter:
+        """Return the rate limiter for a URL's host, creating it on first use."""
+        host = urlparse(url).netloc
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            limiter = self._limiters[host] = HostRateLimiter(HOST_RATE, HOST_RATE_PERIOD)
+        return limiter
 
     def _get_headers(self) -> dict:
-        """Return randomized request headers."""
-        return {
-            "User-Agent": random.choice(USER_AGENTS),
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate, br",
-            "Connection": "keep-alive",
-            "Cache-Control": "no-cache",
-        }
+        """Return randomized request headers (shared; do not mutate)."""
+        return _HEADER_POOL[random.randrange(len(_HEADER_POOL))]
 
-    async def _fetch_page(self, url: str) -> Optional[str]:
+    async def _fetch_page(self, url: str) -> Optional[bytes]:
         """
         Fetch a URL with retry + exponential backoff.
-        Returns HTML string or None on failure.
+        Returns the HTML body as UTF-8 bytes, or None on failure.
         """
+        limiter = self._host_limiter(url)
         for attempt in range(1, MAX_RETRIES + 1):
+            await limiter.acquire()
             try:
-                async with httpx.AsyncClient(
-                    follow_redirects=True,
+                async with self._get_client().stream(
+                    "GET",
+                    url,
+                    headers=self._get_headers(),
                     timeout=httpx.Timeout(BASE_TIMEOUT + attempt * 2),
-                    verify=True,
-                ) as client:
-                    response = await client.get(url, headers=self._get_headers())
+                ) as response:
                     response.raise_for_status()
 
                     content_type = response.headers.get("content-type", "")
@@ -155,8 +390,11 @@ class CompetitorScraper:
                         logger.warning(f"Non-HTML response from {url}: {content_type}")
                         return None
 
-                    logger.info(f"✓ Fetched {url} (attempt {attempt}, {len(response.text)} chars)")
-                    return response.text
+                    content, complete = await self._read_body(response)
+
+                note = "" if complete else ", stopped at JSON-LD price"
+                logger.info(f"✓ Fetched {url} (attempt {attempt}, {len(content)} bytes{note})")
+                return content
 
             except httpx.TimeoutException:
                 logger.warning(f"Timeout on {url} (attempt {attempt}/{MAX_RETRIES})")
@@ -165,6 +403,10 @@ class CompetitorScraper:
                 if e.response.status_code == 403:
                     logger.error(f"Access denied for {url} — likely blocked")
                     return None
+                retry_after = _retry_after_seconds(e.response)
+                if retry_after is not None and e.response.status_code in (429, 503):
+                    logger.info(f"Pausing {urlparse(url).netloc} for {retry_after:.1f}s (Retry-After)")
+                    limiter.pause(retry_after)
             except httpx.RequestError as e:
                 logger.warning(f"Request error on {url}: {e} (attempt {attempt}/{MAX_RETRIES})")
 
@@ -176,49 +418,91 @@ class CompetitorScraper:
         logger.error(f"✗ Failed to fetch {url} after {MAX_RETRIES} attempts")
         return None
 
-    def _extract_price(self, html: str, url: str) -> Optional[float]:
-        """
-        Extract price from HTML using multi-strategy CSS selectors.
-        Tries each selector in priority order with fallback.
+    async def _read_body(self, response: httpx.Response) -> tuple[bytes, bool]:
         """
-        soup = BeautifulSoup(html, "lxml")
+        Read a streamed response body as UTF-8 bytes.
 
-        # Strategy 1: Try CSS selectors in order
-        for selector in PRICE_SELECTORS:
-            try:
-                elements = soup.select(selector)
-                for el in elements:
-                    # Try data-price attribute first
-                    data_price = el.get("data-price") or el.get("content")
-                    if data_price:
-                        price = normalize_price(str(data_price))
-                        if price:
-                            logger.debug(f"Price from attr [{selector}]: {price}")
-                            return price
-
-                    # Try text content
-                    price = normalize_price(el.get_text(strip=True))
-                    if price:
-                        logger.debug(f"Price from text [{selector}]: {price}")
-                        return price
-            except Exception:
+        Returns (body, complete).  A UTF-8 body stops downloading once a
+        closed JSON-LD block yields a price: _extract_price takes that
+        price before looking at anything else, so the rest of the page
+        could not change the result.  Any other charset is read in full
+        and transcoded.
+        """
+        if codecs.lookup(response.encoding).name not in ("utf-8", "ascii"):
+            await response.aread()
+            return response.text.encode("utf-8"), True
+
+        body = bytearray()
+        resume: Optional[int] = 0
+        async for chunk in response.aiter_bytes():
+            body += chunk
+            if resume is None:
                 continue
-
-        # Strategy 2: Regex scan on raw HTML for price patterns
-        price_patterns = [
-            r'["\']\s*price["\']?\s*[:=]\s*["\']?\s*([\d,]+\.?\d*)',
-            r'₹\s*([\d,]+\.?\d*)',
-            r'Rs\.?\s*([\d,]+\.?\d*)',
-            r'\$\s*([\d,]+\.?\d*)',
-        ]
-        for pattern in price_patterns:
-            match = re.search(pattern, html, re.IGNORECASE)
-            if match:
-                price = normalize_price(match.group(1))
+            raw, resume = _jsonld_scan(body, resume)
+            if raw:
+                if normalize_price(raw):
+                    return bytes(body), False
+                # The first JSON-LD price is unusable, so extraction falls
+                # through to the CSS selectors, which need the whole page
+                resume = None
+        return bytes(body), True
+
+    def _parse_once(self, html: bytes) -> ParsedPage:
+        """Wrap fetched HTML for extraction; parsing happens lazily, once."""
+        return ParsedPage(html)
+
+    def _price_from_node(self, el, selector: str) -> Optional[float]:
+        """Price from a matched element's data-price/content attribute, else its text."""
+        # Try data-price attribute first
+        data_price = el.attributes.get("data-price") or el.attributes.get("content")
+        if data_price:
+            price = normalize_price(str(data_price))
+            if price:
+                logger.debug(f"Price from attr [{selector}]: {price}")
+                return price
+
+        # Try text content
+        price = normalize_price(el.text(strip=True))
+        if price:
+            logger.debug(f"Price from text [{selector}]: {price}")
+        return price
+
+    def _extract_price(self, page: ParsedPage, url: str) -> Optional[float]:
+        """
+        Extract price from a page: a JSON-LD offer price if present, else
+        multi-strategy CSS selectors in priority order, else a regex scan.
+        """
+        # Strategy 1: JSON-LD price, found without parsing the page
+        raw = _jsonld_price_text(page.raw)
+        if raw:
+            price = normalize_price(raw)
+            if price:
+                logger.debug(f"Price from JSON-LD: {price}")
+                return price
+
+        # Strategy 2: Try CSS selectors in order.  The first match nearly
+        # always holds the price and css_first stops the tree walk there;
+        # the full match list is collected only when it doesn't
+        tree = page.tree
+        for selector in _SAFE_PRICE_SELECTORS:
+            first = tree.css_first(selector)
+            if first is None:
+                continue
+            price = self._price_from_node(first, selector)
+            if price:
+                return price
+            for el in tree.css(selector)[1:]:
+                price = self._price_from_node(el, selector)
                 if price:
-                    logger.debug(f"Price from regex [{pattern[:30]}...]: {price}")
                     return price
 
+        # Strategy 3: Regex scan on raw HTML for price patterns
+        for pattern, raw in _raw_price_candidates(page):
+            price = normalize_price(raw)
+            if price:
+                logger.debug(f"Price from regex [{pattern[:30]}...]: {price}")
+                return price
+
         logger.warning(f"No price found on {url}")
         return None
 
@@ -251,7 +535,7 @@ class CompetitorScraper:
             self.errors.append({"competitor": competitor, "url": url, "error": "Fetch failed"})
             return None
 
-        price = self._extract_price(html, url)
+        price = self._extract_price(self._parse_once(html), url)
         if not price:
             self.errors.append({"competitor": competitor, "url": url, "error": "Price not found"})
             return None
@@ -267,7 +551,8 @@ class CompetitorScraper:
 
     async def scrape_all(self, targets: list[dict]) -> dict:
         """
-        Scrape all competitor targets with rate limiting.
+        Scrape all competitor targets concurrently with per-host rate
+        limiting.
 
         Args:
             targets: list of dicts, each with product_id, competitor_name, url.
@@ -278,16 +563,34 @@ class CompetitorScraper:
         self.results = []
         self.errors = []
 
-        for i, target in enumerate(targets):
-            result = await self.scrape_single(target)
-            if result:
-                self.results.append(result)
+        # Each host's rate limiter spaces out its requests, so a slow or
+        # rate-limited host never holds up targets on other hosts
+        global_slots = asyncio.Semaphore(MAX_CONCURRENT_SCRAPES)
+        hosts = [urlparse(t.get("url", "")).netloc for t in targets]
+        host_slots = {host: asyncio.Semaphore(PER_HOST_CONCURRENCY) for host in hosts}
 
-            # Rate limit: random delay between requests
-            if i < len(targets) - 1:
-                delay = random.uniform(MIN_DELAY, MAX_DELAY)
-                logger.info(f"Rate limit: waiting {delay:.1f}s...")
-                await asyncio.sleep(delay)
+        async def scrape_limited(target: dict, host: str) -> Optional[dict]:
+            async with host_slots[host], global_slots:
+                return await self.scrape_single(target)
+
+        try:
+            outcomes = await asyncio.gather(
+                *(scrape_limited(t, host) for t, host in zip(targets, hosts)),
+                return_exceptions=True,
+            )
+        finally:
+            await self.aclose()
+
+        for target, outcome in zip(targets, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"✗ Scrape failed for {target.get('url', '')}: {outcome}")
+                self.errors.append({
+                    "competitor": target.get("competitor_name", "unknown"),
+                    "url": target.get("url", ""),
+                    "error": str(outcome),
+                })
+            elif outcome:
+                self.results.append(outcome)
 
         # Store valid results in Supabase
         stored_count = 0
@@ -313,26 +616,44 @@ class CompetitorScraper:
         Validate and batch insert scraped prices into Supabase.
         Returns count of successfully stored records.
         """
-        valid_records = []
-        for r in results:
-            try:
-                validated = CompetitorPriceCreate(**r)
-                valid_records.append(validated.model_dump())
-            except Exception as e:
-                logger.warning(f"Validation failed for {r}: {e}")
+        # Validate the whole list in one pass
+        try:
+            valid_records = _PRICE_LIST.dump_python(_PRICE_LIST.validate_python(results))
+        except ValidationError:
+            # Re-validate row by row so one bad record doesn't drop the rest
+            valid_records = []
+            for r in results:
+                try:
+                    valid_records.append(CompetitorPriceCreate.model_validate(r).model_dump())
+                except ValidationError as e:
+                    logger.warning(f"Validation failed for {r}: {e}")
 
         if not valid_records:
             logger.warning("No valid records to store")
             return 0
 
-        try:
-            response = supabase.table("competitor_prices").insert(valid_records).execute()
-            count = len(response.data) if response.data else 0
-            logger.info(f"✓ Stored {count} records in competitor_prices")
-            return count
-        except Exception as e:
-            logger.error(f"✗ Supabase insert failed: {e}")
-            return 0
+        # Insert in bounded batches so each request stays under the
+        # payload limit and one failed batch doesn't drop the rest.  The
+        # client blocks, so batches run in worker threads, a few at a time
+        semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+        async def store_batch(start: int) -> int:
+            batch = valid_records[start:start + INSERT_BATCH_SIZE]
+            async with semaphore:
+                try:
+                    query = supabase.table("competitor_prices").insert(batch)
+                    response = await asyncio.to_thread(query.execute)
+                    return len(response.data) if response.data else 0
+                except Exception as e:
+                    logger.error(f"✗ Supabase insert failed for rows {start}–{start + len(batch) - 1}: {e}")
+                    return 0
+
+        counts = await asyncio.gather(
+            *(store_batch(start) for start in range(0, len(valid_records), INSERT_BATCH_SIZE))
+        )
+        count = sum(counts)
+        logger.info(f"✓ Stored {count} records in competitor_prices")
+        return count
 
 
 # ── Standalone test ──────────────────────────────────────────────────
@@ -357,4 +678,4 @@ if __name__ == "__main__":
         for e in result["errors"]:
             print(f"  ERROR: {e}")
 
-    asyncio.run(_test())
+    (uvloop.run if uvloop else asyncio.run)(_test())
@@ -20,6 +20,15 @@ import logging
 from datetime import datetime, timezone
 from typing import Optional
 
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+
+try:
+    import uvloop  # faster event loop for standalone runs
+except ImportError:
+    uvloop = None
+
+from db.constants import INSERT_BATCH_SIZE, INSERT_CONCURRENCY
 from db.supabase_client import supabase
 from db.schemas import TrendMetricCreate
 
@@ -35,6 +44,13 @@ if not logger.handlers:
     ))
     logger.addHandler(handler)
 
+# ── Constants ────────────────────────────────────────────────────────
+
+# Validates a whole batch of trend metrics in one pydantic-core pass
+_TREND_LIST = TypeAdapter(list[TrendMetricCreate])
+
+PYTRENDS_BATCH_SIZE = 5       # keywords per Google query (pytrends maximum)
+
 
 # ── Trends Fetcher ───────────────────────────────────────────────────
 
@@ -54,6 +70,19 @@ class TrendsFetcher:
         self.timeframe = timeframe
         self.results: list[dict] = []
         self.errors: list[dict] = []
+        self._pytrends = None
+
+    def _get_pytrends(self):
+        """
+        Return the shared pytrends client, creating it on first use, so the
+        Google session handshake happens once rather than per keyword.
+        Raises ImportError if pytrends is not installed.
+        """
+        if self._pytrends is None:
+            from pytrends.request import TrendReq
+
+            self._pytrends = TrendReq(hl="en-US", tz=330, retries=2, backoff_factor=1.0)
+        return self._pytrends
 
     def _compute_trend_score(self, interest_data: list[int]) -> tuple[float, str]:
         """
@@ -88,6 +117,42 @@ class TrendsFetcher:
 
         return (round(score, 2), direction)
 
+    def _compute_trend_scores_batch(self, interest: np.ndarray) -> list[tuple[float, str]]:
+        """
+        Score many time series at once from a (time × keyword) array,
+        one column per keyword, as pytrends returns them.  Same rules as
+        _compute_trend_score, applied to every column in one pass.
+
+        Returns:
+            One (score, direction) pair per column, in column order.
+        """
+        interest = np.asarray(interest, dtype=np.float64)
+        n, k = interest.shape
+        if n < 2:
+            return [(0.0, "stable")] * k
+
+        # Score = latest value (already 0–100 from Google)
+        scores = interest[-1]
+
+        # Direction = compare last third of data vs first third
+        third = max(n // 3, 1)
+        early_avg = interest[:third].sum(axis=0) / third
+        late_avg = interest[-third:].sum(axis=0) / third
+
+        flat = early_avg == 0
+        change_pct = np.divide(
+            late_avg - early_avg, early_avg,
+            out=np.zeros(k), where=~flat,
+        ) * 100
+        rising = np.where(flat, late_avg > 0, change_pct > 10)
+        falling = ~flat & (change_pct < -10)
+        directions = np.where(rising, "rising", np.where(falling, "falling", "stable"))
+
+        return [
+            (round(score, 2), direction)
+            for score, direction in zip(scores.tolist(), directions.tolist())
+        ]
+
     async def fetch_single(self, product_id: str, keyword: str) -> Optional[dict]:
         """
         Fetch trend data for a single keyword.
@@ -100,10 +165,7 @@ class TrendsFetcher:
             dict with trend_score and direction, or None on failure.
         """
         try:
-            
-            from pytrends.request import TrendReq
-
-            pytrends = TrendReq(hl="en-US", tz=330, retries=2, backoff_factor=1.0)
+            pytrends = self._get_pytrends()
             pytrends.build_payload([keyword], cat=0, timeframe=self.timeframe, geo=self.geo)
 
             # Get interest over time
@@ -133,6 +195,85 @@ class TrendsFetcher:
             logger.info("Falling back to simulated trend data")
             return self._simulate_trend(product_id, keyword)
 
+    async def fetch_batch(self, items: list[tuple[str, str]]) -> list[Optional[dict]]:
+        """
+        Fetch trend data for up to PYTRENDS_BATCH_SIZE keywords in one query.
+
+        Args:
+            items: (product_id, keyword) pairs.
+
+        Returns:
+            One result dict per pair, in order; simulated for keywords
+            Google returned no data for.  A keyword whose column is all
+            zeros next to busier ones is queried again on its own.
+        """
+        keywords = list(dict.fromkeys(keyword for _, keyword in items))
+        try:
+            pytrends = self._get_pytrends()
+            pytrends.build_payload(keywords, cat=0, timeframe=self.timeframe, geo=self.geo)
+
+            # Get interest over time, one column per keyword
+            interest_df = pytrends.interest_over_time()
+
+            scores = {}
+            requery = set()
+            found = [] if interest_df.empty else [k for k in keywords if k in interest_df.columns]
+            if found:
+                interest = interest_df[found].to_numpy(dtype=np.float64)
+                # Google scales a multi-keyword query so the group's peak is
+                # 100 and rounds anything below 1 down to 0.  A quiet keyword
+                # can come back all zeros beside a busy one, which says
+                # nothing about its own trend, so it is queried again alone
+                peaks = interest.max(axis=0)
+                if len(keywords) > 1:
+                    requery = {k for k, peak in zip(found, peaks) if peak <= 0}
+                    found = [k for k in found if k not in requery]
+                    interest = interest[:, peaks > 0]
+                    peaks = peaks[peaks > 0]
+                if found:
+                    # Rescale each column to its own peak, as a single
+                    # keyword query would return it
+                    interest = np.divide(
+                        interest * 100, peaks,
+                        out=np.zeros_like(interest), where=peaks > 0,
+                    )
+                    scores = dict(zip(found, self._compute_trend_scores_batch(interest)))
+
+        except ImportError:
+            logger.warning("pytrends not installed, using simulated data")
+            return [self._simulate_trend(product_id, keyword) for product_id, keyword in items]
+
+        except Exception as e:
+            logger.warning(f"Trends API error for {keywords}: {e}")
+            logger.info("Falling back to simulated trend data")
+            return [self._simulate_trend(product_id, keyword) for product_id, keyword in items]
+
+        results = []
+        requeried = {}
+        for product_id, keyword in items:
+            if keyword in requery:
+                if keyword not in requeried:
+                    # Rate limit: another Google query
+                    delay = random.uniform(3.0, 8.0)
+                    logger.info(f"'{keyword}' scaled to zero in its batch; re-querying alone in {delay:.1f}s...")
+                    await asyncio.sleep(delay)
+                    requeried[keyword] = await self.fetch_single(product_id, keyword)
+                results.append({**requeried[keyword], "product_id": product_id})
+                continue
+
+            if keyword not in scores:
+                logger.warning(f"No data returned for keyword: {keyword}")
+                results.append(self._simulate_trend(product_id, keyword))
+                continue
+
+            score, direction = scores[keyword]
+            results.append({
+                "product_id": product_id,
+                "trend_score": score,
+            })
+            logger.info(f"✓ {keyword}: score={score}, direction={direction}")
+        return results
+
     def _simulate_trend(self, product_id: str, keyword: str) -> dict:
         """
         Generate simulated trend data when Google Trends is unavailable.
@@ -161,22 +302,30 @@ class TrendsFetcher:
         self.results = []
         self.errors = []
 
-        for i, item in enumerate(product_keywords):
+        pending = []
+        for item in product_keywords:
             product_id = item.get("product_id", "")
             keyword = item.get("keyword", "")
 
             if not keyword:
                 self.errors.append({"product_id": product_id, "error": "No keyword"})
                 continue
+            pending.append((product_id, keyword))
 
-            result = await self.fetch_single(product_id, keyword)
-            if result:
-                self.results.append(result)
-            else:
-                self.errors.append({"product_id": product_id, "keyword": keyword, "error": "Fetch failed"})
+        # Several keywords share each Google query and throttle wait
+        batches = [
+            pending[i:i + PYTRENDS_BATCH_SIZE]
+            for i in range(0, len(pending), PYTRENDS_BATCH_SIZE)
+        ]
+        for i, batch in enumerate(batches):
+            for (product_id, keyword), result in zip(batch, await self.fetch_batch(batch)):
+                if result:
+                    self.results.append(result)
+                else:
+                    self.errors.append({"product_id": product_id, "keyword": keyword, "error": "Fetch failed"})
 
             # Rate limit: Google throttles aggressively
-            if i < len(product_keywords) - 1:
+            if i < len(batches) - 1:
                 delay = random.uniform(3.0, 8.0)
                 logger.info(f"Rate limit: waiting {delay:.1f}s...")
                 await asyncio.sleep(delay)
@@ -202,25 +351,43 @@ class TrendsFetcher:
 
     async def _store_results(self, results: list[dict]) -> int:
         """Validate and insert trend metrics into Supabase."""
-        valid_records = []
-        for r in results:
-            try:
-                validated = TrendMetricCreate(**r)
-                valid_records.append(validated.model_dump())
-            except Exception as e:
-                logger.warning(f"Validation failed: {e}")
+        # Validate the whole list in one pass
+        try:
+            valid_records = _TREND_LIST.dump_python(_TREND_LIST.validate_python(results))
+        except ValidationError:
+            # Re-validate row by row so one bad record doesn't drop the rest
+            valid_records = []
+            for r in results:
+                try:
+                    valid_records.append(TrendMetricCreate.model_validate(r).model_dump())
+                except ValidationError as e:
+                    logger.warning(f"Validation failed: {e}")
 
         if not valid_records:
             return 0
 
-        try:
-            response = supabase.table("trend_metrics").insert(valid_records).execute()
-            count = len(response.data) if response.data else 0
-            logger.info(f"✓ Stored {count} records in trend_metrics")
-            return count
-        except Exception as e:
-            logger.error(f"✗ Supabase insert failed: {e}")
-            return 0
+        # Insert in bounded batches so each request stays under the
+        # payload limit and one failed batch doesn't drop the rest.  The
+        # client blocks, so batches run in worker threads, a few at a time
+        semaphore = asyncio.Semaphore(INSERT_CONCURRENCY)
+
+        async def store_batch(start: int) -> int:
+            batch = valid_records[start:start + INSERT_BATCH_SIZE]
+            async with semaphore:
+                try:
+                    query = supabase.table("trend_metrics").insert(batch)
+                    response = await asyncio.to_thread(query.execute)
+                    return len(response.data) if response.data else 0
+                except Exception as e:
+                    logger.error(f"✗ Supabase insert failed for rows {start}–{start + len(batch) - 1}: {e}")
+                    return 0
+
+        counts = await asyncio.gather(
+            *(store_batch(start) for start in range(0, len(valid_records), INSERT_BATCH_SIZE))
+        )
+        count = sum(counts)
+        logger.info(f"✓ Stored {count} records in trend_metrics")
+        return count
 
 
 # ── Standalone test ──────────────────────────────────────────────────
@@ -239,4 +406,4 @@ if __name__ == "__main__":
         for r in result["fetched"]:
             print(f"  Score: {r['trend_score']}")
 
-    asyncio.run(_test())
+    (uvloop.run if uvloop else asyncio.run)(_test())
@@ -1,11 +1,30 @@
+"""
+Demo insert of sample products, sent as batched inserts rather than one
+request per row.  Chunks use INSERT_BATCH_SIZE, the same policy as the
+scraper's and trends fetcher's _store_results.
+
+Usage:
+    python test.py [--batch-size N]
+"""
+
+import argparse
+
+from db.constants import INSERT_BATCH_SIZE
 from db.supabase_client import supabase
 
-data = {
-    "name": "iPhone 15",
-    "category": "smartphones",
-    "base_price": 800
-}
+data = [
+    {"name": "iPhone 15", "category": "smartphones", "base_price": 800},
+    {"name": "Galaxy S24", "category": "smartphones", "base_price": 750},
+    {"name": "Pixel 8", "category": "smartphones", "base_price": 700},
+]
 
-response = supabase.table("products").insert(data).execute()
+parser = argparse.ArgumentParser(description="Insert sample products in batches.")
+parser.add_argument("--batch-size", type=int, default=INSERT_BATCH_SIZE,
+                    help=f"rows per insert request (default: {INSERT_BATCH_SIZE})")
+args = parser.parse_args()
+if args.batch_size < 1:
+    parser.error("--batch-size must be at least 1")
 
-print(response)
+for start in range(0, len(data), args.batch_size):
+    response = supabase.table("products").insert(data[start:start + args.batch_size]).execute()
+    print(response)